@@ -0,0 +1,122 @@
+"""
+Optional write-behind buffer for answer logging.
+
+With SPELLINGBEE_WRITE_BEHIND=1, record() only appends the answer to an
+in-memory buffer and returns. A background thread writes buffered answers
+to SQLite in one transaction every FLUSH_INTERVAL seconds, or sooner once
+FLUSH_BATCH answers are waiting. Whatever is left is flushed at interpreter
+exit. The read helpers here merge still-buffered answers into the DB
+results, so the UI shows new counts immediately.
+
+With write-behind off, record() writes synchronously through db.
+"""
+import atexit
+import os
+import threading
+
+import db
+
+WRITE_BEHIND = os.environ.get("SPELLINGBEE_WRITE_BEHIND", "") not in ("", "0")
+FLUSH_INTERVAL = float(os.environ.get("SPELLINGBEE_FLUSH_INTERVAL", 1.0))
+FLUSH_BATCH = int(os.environ.get("SPELLINGBEE_FLUSH_BATCH", 200))
+
+_buffer = []  # (user_id, date, word, is_correct, attempts, schedule), oldest first
+_cond = threading.Condition()
+# Held while a batch is being committed and removed from the buffer, and by
+# readers, so nobody sees a batch both in the DB and still in the buffer
+_commit_lock = threading.Lock()
+_thread = None
+_stopping = False
+
+
+def _ensure_thread():
+    global _thread
+    if _thread is None:
+        _thread = threading.Thread(target=_run, name="answer-log-flush", daemon=True)
+        _thread.start()
+
+
+def _run():
+    while True:
+        with _cond:
+            _cond.wait_for(lambda: _stopping or len(_buffer) >= FLUSH_BATCH, timeout=FLUSH_INTERVAL)
+            stopping = _stopping
+        try:
+            flush()
+        except Exception:
+            pass  # keep the events buffered and retry on the next tick
+        if stopping:
+            return
+
+
+def record(user_id, today_date, word, is_correct, attempts, schedule=None):
+    """Log an answer (and the word's new (box, due), if graded) and return the new data version."""
+    if not WRITE_BEHIND:
+        return db.record_answer(user_id, today_date, word, is_correct, attempts, schedule)
+    with _cond:
+        _buffer.append((user_id, today_date, word, bool(is_correct), attempts, schedule))
+        if len(_buffer) >= FLUSH_BATCH:
+            _cond.notify()
+    _ensure_thread()
+    return db.bump_version()
+
+
+def flush():
+    """Write every buffered answer to the database now."""
+    with _commit_lock:
+        with _cond:
+            batch = list(_buffer)
+        if not batch:
+            return
+        db.record_answers(batch)
+        with _cond:
+            del _buffer[:len(batch)]
+
+
+def today_correct_count(user_id, today_date):
+    """db.today_correct_count plus correct answers still in the buffer."""
+    with _commit_lock:
+        count = db.today_correct_count(user_id, today_date)
+        with _cond:
+            return count + sum(1 for u, d, _, c, _, _ in _buffer if c and u == user_id and d == today_date)
+
+
+def incorrect_words(user_id):
+    """db.incorrect_words plus misspelled words still in the buffer."""
+    with _commit_lock:
+        words = db.incorrect_words(user_id)
+        with _cond:
+            return words + [w for u, _, w, c, _, _ in _buffer if not c and u == user_id]
+
+
+def load_schedule(user_id):
+    """db.load_schedule with schedule updates still in the buffer applied."""
+    with _commit_lock:
+        schedule = db.load_schedule(user_id)
+        with _cond:
+            schedule.update((w, s) for u, _, w, _, _, s in _buffer if s is not None and u == user_id)
+    return schedule
+
+
+def due_words(user_id, now):
+    """db.due_words, corrected for schedule updates still in the buffer."""
+    with _commit_lock:
+        words = set(db.due_words(user_id, now))
+        with _cond:
+            pending = {w: s for u, _, w, _, _, s in _buffer if s is not None and u == user_id}
+    words.difference_update(pending)
+    return sorted(words | {w for w, (_, due) in pending.items() if due <= now})
+
+
+def stop():
+    """Stop the flush thread after a final flush."""
+    global _stopping
+    with _cond:
+        _stopping = True
+        _cond.notify()
+    if _thread is not None:
+        _thread.join(timeout=10)
+    flush()
+
+
+atexit.register(stop)
@@ -1,251 +1,139 @@
+import time
+_SCRIPT_START = time.perf_counter()  # cold-start clock; see the debug panel
+
 import streamlit as st
-import pandas as pd
-import sqlite3
 import os
-import random
-import io
+import uuid
 from datetime import date
-from gtts import gTTS
+
+import answer_log
+import db
+import near_miss
+import perf_trace
+import prefetch
+import scheduler
+import static_audio
+import tts_backends
+import word_store
 
 # --- CONFIGURATION & PAGE SETUP ---
 st.set_page_config(page_title="Spelling Bee 2026", page_icon="🏆", layout="centered")
 
+# --- PERF TRACING ---
+# Opt-in via SPELLINGBEE_TRACE=1 or the sidebar debug checkbox; spans are no-ops otherwise
+st.session_state.rerun_count = st.session_state.get("rerun_count", 0) + 1
+if perf_trace.TRACE_ENABLED or st.session_state.get("debug_trace"):
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    perf_trace.start_trace(st.session_state.session_id, st.session_state.rerun_count)
+
 # --- ANIME DARK PURPLE THEME CSS ---
-st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;600;700&display=swap');
-    
-    /* Global Styles */
-    .stApp {
-        background: linear-gradient(135deg, #1a1025 0%, #2d1b3d 50%, #1a1025 100%);
-        font-family: 'Poppins', sans-serif;
-    }
-    
-    /* Headers */
-    h1, h2, h3 {
-        color: #e0b3ff !important;
-        font-weight: 700 !important;
-        text-shadow: 0 0 20px rgba(224, 179, 255, 0.5);
-    }
-    
-    /* Text */
-    p, label, .stMarkdown {
-        color: #d4b5f0 !important;
-    }
-    
-    /* Tabs */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-        background-color: rgba(45, 27, 61, 0.6);
-        border-radius: 15px;
-        padding: 10px;
-        border: 2px solid rgba(147, 51, 234, 0.3);
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        background-color: rgba(88, 28, 135, 0.4);
-        border-radius: 10px;
-        color: #c4a7e7;
-        font-weight: 600;
-        border: 1px solid rgba(147, 51, 234, 0.3);
-        padding: 12px 24px;
-        transition: all 0.3s ease;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background: linear-gradient(135deg, #7c3aed 0%, #a855f7 100%);
-        color: white !important;
-        border: 1px solid #9333ea;
-        box-shadow: 0 0 20px rgba(168, 85, 247, 0.6);
-    }
-    
-    /* Input Fields */
-    .stTextInput input {
-        background-color: rgba(45, 27, 61, 0.8) !important;
-        border: 2px solid rgba(147, 51, 234, 0.5) !important;
-        border-radius: 12px !important;
-        color: #e0b3ff !important;
-        font-size: 18px !important;
-        padding: 12px !important;
-        transition: all 0.3s ease;
-    }
-    
-    .stTextInput input:focus {
-        border-color: #a855f7 !important;
-        box-shadow: 0 0 20px rgba(168, 85, 247, 0.4) !important;
-    }
-    
-    /* Buttons */
-    .stButton button {
-        background: linear-gradient(135deg, #7c3aed 0%, #a855f7 100%) !important;
-        color: white !important;
-        border: none !important;
-        border-radius: 12px !important;
-        padding: 12px 32px !important;
-        font-weight: 600 !important;
-        font-size: 16px !important;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 15px rgba(124, 58, 237, 0.4);
-    }
-    
-    .stButton button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 6px 25px rgba(168, 85, 247, 0.6);
-    }
-    
-    /* Selectbox */
-    .stSelectbox > div > div {
-        background-color: rgba(45, 27, 61, 0.8) !important;
-        border: 2px solid rgba(147, 51, 234, 0.5) !important;
-        border-radius: 12px !important;
-        color: #e0b3ff !important;
-    }
-    
-    /* Progress Bar */
-    .stProgress > div > div > div {
-        background: linear-gradient(90deg, #7c3aed 0%, #a855f7 50%, #fbbf24 100%);
-        border-radius: 10px;
-        box-shadow: 0 0 20px rgba(168, 85, 247, 0.5);
-    }
-    
-    /* Success/Error Messages */
-    .stSuccess {
-        background-color: rgba(34, 197, 94, 0.2) !important;
-        border: 2px solid #22c55e !important;
-        border-radius: 12px !important;
-        color: #86efac !important;
-    }
-    
-    .stError {
-        background-color: rgba(239, 68, 68, 0.2) !important;
-        border: 2px solid #ef4444 !important;
-        border-radius: 12px !important;
-        color: #fca5a5 !important;
-    }
-    
-    /* Dataframe */
-    .stDataFrame {
-        background-color: rgba(45, 27, 61, 0.6) !important;
-        border-radius: 12px !important;
-        border: 2px solid rgba(147, 51, 234, 0.3) !important;
-    }
-    
-    /* Divider */
-    hr {
-        border-color: rgba(147, 51, 234, 0.3) !important;
-        margin: 30px 0 !important;
-    }
-    
-    /* Audio Player */
-    audio {
-        filter: hue-rotate(270deg) saturate(1.5);
-    }
-    
-    /* Cards/Containers */
-    .element-container {
-        background-color: rgba(45, 27, 61, 0.3);
-        border-radius: 12px;
-        padding: 8px;
-    }
-    </style>
-""", unsafe_allow_html=True)
+THEME_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "style.css")
+
+@st.cache_resource
+def _theme_css(path, mtime_ns):
+    # Read once per process (and again only if the file changes)
+    with open(path, encoding="utf-8") as f:
+        return f"<style>{f.read()}</style>"
+
+with perf_trace.span("theme"):
+    st.markdown(_theme_css(THEME_FILE, os.stat(THEME_FILE).st_mtime_ns), unsafe_allow_html=True)
 
 # --- ENCOURAGEMENT HEADER ---
 st.markdown("""
-    <div style="
-        background: linear-gradient(to right, rgba(26, 16, 34, 0.9) 0%, rgba(26, 16, 34, 0.2) 60%, rgba(26, 16, 34, 0) 100%), 
-                    url(https://lh3.googleusercontent.com/aida-public/AB6AXuCr7AYPvVeqUPBshUWTIWJ2iXIQ-8K8woQJVGZzn3gXZOsD91x8eOwU5k1T9eDH0b8uekjykG9rQWN9kNidIOCSsd7p06J8IQ-11QKISWUKktStRsvX6OMpfJvCsTRYpo0Od6Lo3PzYt_R-4ub7Qf8h2gF39R8zVmMyA__pbMkAN2-H2q9T7SHEMfm5ULKJ1bkUS8YXaE2PlMU-5ep8QL2i4x-7ScztKYKjlG8ZguBjXW60PcBOj9SX88vAxsPyEuuZpbcOYlkE3Uc);
-        background-size: cover;
-        background-position: center;
-        padding: 30px;
-        border-radius: 20px;
-        text-align: center;
-        margin-bottom: 30px;
-        border: 3px solid rgba(168, 85, 247, 0.6);
-        box-shadow: 0 8px 32px rgba(124, 58, 237, 0.4);
-    ">
-        <h1 style="
-            color: #fbbf24;
-            margin: 0;
-            font-family: 'Poppins', sans-serif;
-            text-align: left;
-            font-size: 2.5rem;
-            font-weight: 800;
-            text-shadow: 0 0 30px rgba(251, 191, 36, 0.8), 0 0 60px rgba(168, 85, 247, 0.6);
-        ">
-            GO FOR THE GOLD, VIVIAN! ✨
-        </h1>
-        <p style="
-            color: #e0b3ff;
-            font-size: 1.2rem;
-            font-weight: 600;
-            margin: 15px 0 0 0;
-            text-align: left;
-            text-shadow: 0 2px 10px rgba(0, 0, 0, 0.5);
-        ">
-            "Every word you master today is a step closer to the 2026 Trophy! 🏆✨"
-        </p>
+    <div class="encouragement-banner">
+        <h1>GO FOR THE GOLD, VIVIAN! ✨</h1>
+        <p>"Every word you master today is a step closer to the 2026 Trophy! 🏆✨"</p>
     </div>
 """, unsafe_allow_html=True)
 
-DB_PATH = "scores.db"
-DATA_FILE = "Spelling bee 2026.xlsx"
+DATA_SOURCES = word_store.data_sources()
+# Time-to-first-render budget for a fresh process, shown in the debug panel
+STARTUP_TARGET_MS = float(os.environ.get("SPELLINGBEE_STARTUP_TARGET_MS", 1500))
 DAILY_EXAM_GOAL = 33
+LEARN_PAGE_SIZES = [10, 25, 50, 100]
+DUE_MODE = "🧠 Due for Review"
 
-# --- DATABASE FUNCTIONS ---
-def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-def init_db():
-    conn = get_db_connection()
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS scores (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT NOT NULL,
-            word TEXT NOT NULL,
-            correctly_spelled INTEGER NOT NULL,
-            attempts INTEGER NOT NULL
-        )
-    """)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS daily_exam_progress (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT NOT NULL UNIQUE,
-            correct_count INTEGER DEFAULT 0,
-            total_attempted INTEGER DEFAULT 0
-        )
-    """)
-    conn.commit()
-    conn.close()
+@st.cache_resource(max_entries=2)
+def _load_word_store(sources, fingerprint):
+    # Shared by all sessions; fingerprint only keys the cache so an edited or added file is
+    # reloaded. Unchanged files come from their snapshots, so only the edited one is parsed.
+    # A failed load raises, so it is not cached and the next rerun tries again.
+    return word_store.WordStore(*word_store.load_word_lists(sources))
+
+@st.cache_resource
+def _last_good_words():
+    # The newest store that loaded cleanly, shared by all sessions
+    return {}
 
-@st.cache_data
 def load_words():
-    if not os.path.exists(DATA_FILE):
-        return pd.DataFrame(columns=["word", "definition"])
+    sources = tuple(DATA_SOURCES)
+    last_good = _last_good_words()
     try:
-        df = pd.read_excel(DATA_FILE)
-        word_col = next((c for c in df.columns if str(c).lower() in ["word", "spelling"]), df.columns[0])
-        def_col = next((c for c in df.columns if any(k in str(c).lower() for k in ["def", "meaning", "desc"])), None)
-        
-        clean_rows = []
-        for _, row in df.iterrows():
-            if pd.isna(row[word_col]): continue
-            clean_rows.append({
-                "word": str(row[word_col]).strip(),
-                "definition": str(row[def_col]).strip() if def_col and not pd.isna(row[def_col]) else "No definition available."
-            })
-        return pd.DataFrame(clean_rows).sort_values("word").reset_index(drop=True)
-    except:
-        return pd.DataFrame(columns=["word", "definition"])
+        store = _load_word_store(sources, word_store.sources_fingerprint(sources))
+    except Exception:
+        # e.g. a file caught halfway through being saved: keep serving the last good list
+        return last_good.get("store") or word_store.WordStore([], [])
+    last_good["store"] = store
+    return store
+
+@st.cache_resource
+def _init_db(db_path):
+    # Create/migrate the schema once per process and database file, not on every rerun
+    db.init_db()
+
+@st.cache_resource(max_entries=2)
+def _near_miss_index(_store, version):
+    # One index per word list version, shared by all sessions
+    return near_miss.NearMissIndex(_store.words)
+
+def cached_derived(name, key, compute):
+    """Memoize compute() in session state until key (which includes the DB data version) changes."""
+    cache = st.session_state.setdefault("derived_cache", {})
+    hit = cache.get(name)
+    if hit is not None and hit[0] == key:
+        perf_trace.count("derived_cache_hits")
+        return hit[1]
+    value = compute()
+    cache[name] = (key, value)
+    return value
+
+def rerun():
+    # st.rerun() aborts the script, so close out this rerun's trace first
+    perf_trace.finish_trace()
+    st.rerun()
+
+def show_audio(word, autoplay=False):
+    """Render a word's audio player. Raises tts_backends.TTSError if there is no audio."""
+    if st.get_option("server.enableStaticServing"):
+        # Reference a browser-cacheable file; reruns send no audio bytes
+        url = static_audio.audio_url(word, fetch=prefetch.get_audio)
+        st.markdown(static_audio.audio_tag(url, autoplay), unsafe_allow_html=True)
+    else:
+        audio_bytes = prefetch.get_audio(str(word))
+        st.audio(audio_bytes, format=tts_backends.audio_format(audio_bytes), autoplay=autoplay)
 
 def mask_vowels(word):
     return "".join("_" if char.lower() in "aeiou" else char for char in word)
 
+def marked_spelling(ops):
+    """Markdown for the typed word and the correct word with the differing letters highlighted."""
+    typed, correct = [], []
+    for op, mine, theirs in ops:
+        if op == "equal":
+            typed.append(mine)
+            correct.append(theirs)
+            continue
+        typed.append(f":red[**{mine}**]" if mine else ":red[**" + "_" * len(theirs) + "**]")
+        if theirs:
+            correct.append(f":green[**{theirs}**]")
+    return "".join(typed), "".join(correct)
+
 # --- APP INITIALIZATION ---
-init_db()
-words_df = load_words()
+with perf_trace.span("db.init"):
+    _init_db(db.DB_PATH)
+with perf_trace.span("load_words"):
+    words = load_words()
 
 # Session State Initialization
 if "current_word" not in st.session_state:
@@ -256,15 +144,66 @@ if "last_result" not in st.session_state:
     st.session_state.last_result = None
 if "exam_mode" not in st.session_state:
     st.session_state.exam_mode = "All Words"
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
+# --- STUDENT ---
+# Each student's history is partitioned by user_id; ?student=<name> in the URL preselects it
+if "student" not in st.session_state:
+    st.session_state.student = st.query_params.get("student", db.DEFAULT_USER)
+student = st.sidebar.text_input("👤 Student:", key="student").strip() or db.DEFAULT_USER
+user_id = student.lower()
+if st.query_params.get("student") != student:
+    st.query_params["student"] = student
+if st.session_state.get("user_id") != user_id:
+    st.session_state.user_id = user_id
+    st.session_state.current_word = None
+    st.session_state.deck = None
+    st.session_state.last_result = None
+    st.session_state.attempts = 0
+
+if st.session_state.get("word_version") != words.version:
+    # Word ids are only meaningful within one version of the list: carry the
+    # running deck over to the new ids instead of starting the exam again
+    old_words = st.session_state.get("word_store")
+    deck = st.session_state.get("deck")
+    if old_words is not None and deck is not None:
+        mapping, added = word_store.id_map(old_words, words)
+        # All-words and group decks follow the new list (group boundaries move
+        # as words come and go); pool decks like Incorrect/Due just drop removed words
+        mode = st.session_state.get("exam_mode")
+        members = saved = None
+        if mode == "All Words":
+            members = range(len(words))
+        elif isinstance(mode, int):
+            members = words.group(mode)
+        if members is not None:
+            saved = {words.ids[w]: e for w, e in answer_log.load_schedule(user_id).items() if w in words.ids}
+        deck.remap(mapping, members, saved)
+        current = mapping.get(st.session_state.current_word)
+        if members is not None and current not in members:
+            current = None
+        st.session_state.current_word = current
+        if st.session_state.current_word is None:
+            st.session_state.current_word = deck.pop()
+            st.session_state.attempts = 0
+            st.session_state.last_result = None
+        if added or len(mapping) < len(old_words):
+            st.toast(f"📚 Word list updated: {len(added)} new, {len(old_words) - len(mapping)} removed")
+    else:
+        st.session_state.current_word = None
+        st.session_state.deck = None
+    st.session_state.word_version = words.version
+    st.session_state.word_store = words
 
 # --- UI TABS ---
 tab_exam, tab_learn, tab_stats = st.tabs(["🎯 Daily Exam", "📖 Alphabetical Learn", "📊 My Progress"])
 
 # --- TAB 1: DAILY EXAM ---
-with tab_exam:
+with tab_exam, perf_trace.span("tab.exam"):
     st.header("Daily Challenge")
     
-    modes = ["All Words", "❌ Incorrect Words Only"] + list(range(1, 14))
+    modes = ["All Words", "❌ Incorrect Words Only", DUE_MODE] + list(range(1, words.num_groups + 1))
     
     if st.session_state.exam_mode not in modes:
         st.session_state.exam_mode = "All Words"
@@ -276,74 +215,95 @@ with tab_exam:
         key="exam_mode_selector"
     )
 
-    if "word_queue" not in st.session_state or st.session_state.exam_mode != exam_group:
+    if "deck" not in st.session_state or st.session_state.exam_mode != exam_group:
         st.session_state.exam_mode = exam_group
-        st.session_state.word_queue = []
-
-    if exam_group == "All Words":
-        pool = words_df
-    elif exam_group == "❌ Incorrect Words Only":
-        conn = get_db_connection()
-        bad_list = [row['word'] for row in conn.execute("SELECT DISTINCT word FROM scores WHERE correctly_spelled = 0").fetchall()]
-        conn.close()
-        pool = words_df[words_df['word'].isin(bad_list)]
-    else:
-        words_per_group = max(1, len(words_df) // 13)
-        start_idx = (exam_group - 1) * words_per_group
-        end_idx = start_idx + words_per_group if exam_group < 13 else len(words_df)
-        pool = words_df.iloc[start_idx:end_idx]
-
-    if not pool.empty and len(st.session_state.word_queue) == 0:
-        indices = pool.index.tolist()
-        random.shuffle(indices)
-        st.session_state.word_queue = indices
-        st.session_state.current_word = pool.loc[st.session_state.word_queue.pop(0)]
-        st.session_state.attempts = 0
-
-    if not pool.empty:
-        conn = get_db_connection()
+        st.session_state.deck = None
+        prefetch.cancel(st.session_state.session_id)
+
+    # Pools, the deck and current_word all hold integer ids into `words`
+    if st.session_state.deck is None:
+        if exam_group == "All Words":
+            pool = range(len(words))
+        elif exam_group == "❌ Incorrect Words Only":
+            with perf_trace.span("exam.incorrect_pool"):
+                pool = cached_derived(
+                    "incorrect_pool", (db.data_version(), user_id, words.version),
+                    lambda: words.ids_for(answer_log.incorrect_words(user_id)),
+                )
+        elif exam_group == DUE_MODE:
+            pool = words.ids_for(answer_log.due_words(user_id, int(time.time())))
+        else:
+            pool = words.group(exam_group)
+
+        if pool:
+            # Earliest-due words come first; never-seen words are shuffled among themselves
+            with perf_trace.span("exam.build_deck"):
+                schedule = answer_log.load_schedule(user_id)
+                st.session_state.deck = scheduler.ReviewDeck(pool, {
+                    words.ids[w]: entry for w, entry in schedule.items() if w in words.ids
+                })
+            st.session_state.current_word = st.session_state.deck.pop()
+            st.session_state.attempts = 0
+
+    deck = st.session_state.deck
+    if deck is not None and st.session_state.current_word is not None:
         today_date = date.today().isoformat()
-        row = conn.execute("SELECT correct_count FROM daily_exam_progress WHERE date = ?", (today_date,)).fetchone()
-        score_today = row[0] if row else 0
-        conn.close()
+        with perf_trace.span("exam.progress"):
+            score_today = cached_derived(
+                "score_today", (db.data_version(), user_id, today_date),
+                lambda: answer_log.today_correct_count(user_id, today_date),
+            )
         
         st.progress(min(score_today / DAILY_EXAM_GOAL, 1.0))
         st.write(f"Daily Progress: **{score_today} / {DAILY_EXAM_GOAL}**")
-        st.write(f"🎴 Words remaining in deck: **{len(st.session_state.word_queue)}**")
+        st.write(f"🎴 Reviews due now: **{deck.due_count()}** · new words: **{len(deck.new)}** (deck of {len(deck) + 1})")
 
-        word_to_spell = st.session_state.current_word["word"]
-        audio_io = io.BytesIO()
-        gTTS(text=str(word_to_spell), lang="en").write_to_fp(audio_io)
-        st.audio(audio_io, format="audio/mp3")
+        word_to_spell = words.words[st.session_state.current_word]
+        try:
+            with perf_trace.span("exam.tts"):
+                show_audio(word_to_spell)
+        except tts_backends.TTSError:
+            st.warning("🔇 Pronunciation is unavailable right now. Ask a grown-up to read the word aloud.")
+
+        # Warm the audio for the next few words while the student types
+        upcoming = [words.words[i] for i in deck.peek(prefetch.PREFETCH_DEPTH)]
+        with perf_trace.span("exam.prefetch"):
+            prefetch.prefetch(st.session_state.session_id, exam_group, upcoming)
 
         with st.form(key="spell_form", clear_on_submit=True):
             user_input = st.text_input("Type the word:")
             if st.form_submit_button("Check"):
                 st.session_state.attempts += 1
                 is_correct = user_input.strip().lower() == str(word_to_spell).strip().lower()
-                
-                conn = get_db_connection()
-                conn.execute("INSERT INTO scores (date, word, correctly_spelled, attempts) VALUES (?, ?, ?, ?)",
-                             (today_date, word_to_spell, int(is_correct), st.session_state.attempts))
+                schedule = None
+                if st.session_state.attempts == 1:
+                    # Only the first try on a card moves it between Leitner boxes
+                    schedule = deck.grade(st.session_state.current_word, is_correct)
+                with perf_trace.span("exam.record_answer"):
+                    # The schedule upsert rides in the same (possibly write-behind) transaction
+                    version = answer_log.record(user_id, today_date, word_to_spell, is_correct,
+                                                st.session_state.attempts, schedule)
+                # Write through so the rerun shows the new count without a read,
+                # unless another session also wrote in between
+                derived = st.session_state.derived_cache
+                if derived.get("score_today", (None,))[0] == (version - 1, user_id, today_date):
+                    derived["score_today"] = ((version, user_id, today_date), score_today + int(is_correct))
                 
                 st.session_state.last_result = {
                     "is_correct": is_correct, "word": word_to_spell,
-                    "definition": st.session_state.current_word["definition"]
+                    "definition": words.definitions[st.session_state.current_word],
+                    "feedback": None,
                 }
+                if not is_correct and user_input.strip():
+                    with perf_trace.span("exam.near_miss"):
+                        st.session_state.last_result["feedback"] = near_miss.feedback(
+                            user_input, str(word_to_spell), _near_miss_index(words, words.version))
 
                 if is_correct:
-                    conn.execute("INSERT INTO daily_exam_progress (date, correct_count, total_attempted) VALUES (?, 1, 1) ON CONFLICT(date) DO UPDATE SET correct_count = correct_count + 1, total_attempted = total_attempted + 1", (today_date,))
-                    if st.session_state.word_queue:
-                        st.session_state.current_word = pool.loc[st.session_state.word_queue.pop(0)]
-                    else:
-                        st.session_state.current_word = None
+                    deck.requeue(st.session_state.current_word)
+                    st.session_state.current_word = deck.pop()
                     st.session_state.attempts = 0
-                else:
-                    conn.execute("INSERT INTO daily_exam_progress (date, total_attempted) VALUES (?, 1) ON CONFLICT(date) DO UPDATE SET total_attempted = total_attempted + 1", (today_date,))
-                
-                conn.commit()
-                conn.close()
-                st.rerun()
+                rerun()
 
         if st.session_state.last_result:
             res = st.session_state.last_result
@@ -351,80 +311,158 @@ with tab_exam:
                 st.success("✅ Correct!")
             else:
                 st.error("❌ Incorrect")
+                fb = res.get("feedback")
+                if fb:
+                    if fb["other_list_word"]:
+                        st.info(f"🔀 **{fb['other_list_word']}** is a different word on the list. Listen again!")
+                    else:
+                        letters = "letter" if fb["distance"] == 1 else "letters"
+                        st.write(f"🎯 So close! You were **{fb['distance']}** {letters} away.")
+                        typed_md, correct_md = marked_spelling(fb["ops"])
+                        st.markdown(f"You typed: {typed_md}  \nCorrect: {correct_md}")
+                        if fb["closer_list_words"]:
+                            st.caption("Your spelling is even closer to: " + ", ".join(fb["closer_list_words"]))
                 st.subheader(f"Correct Spelling: :green[{res['word']}]")
                 st.write(f"**Meaning:** {res['definition']}")
        
             if st.button("Next Word"):
-                if st.session_state.word_queue:
-                    st.session_state.current_word = pool.loc[st.session_state.word_queue.pop(0)]
-                    st.session_state.attempts = 0
-                else:
-                    st.session_state.current_word = None
+                deck.requeue(st.session_state.current_word)
+                st.session_state.current_word = deck.pop()
+                st.session_state.attempts = 0
                 st.session_state.last_result = None
-                st.rerun()
+                rerun()
     else:
         st.info("No words found in this mode.")
 
 # --- TAB 2: ALPHABETICAL LEARN ---
-with tab_learn:
+def reset_learn_page():
+    st.session_state.learn_page = 1
+
+def jump_to_letter(letter_pages):
+    letter = st.session_state.learn_letter
+    if letter in letter_pages:
+        st.session_state.learn_page = letter_pages[letter]
+
+with tab_learn, perf_trace.span("tab.learn"):
     st.header("📖 Alphabetical Study Groups")
     
-    group_num = st.selectbox("Select Learning Group (1-13):", range(1, 14), key="learn_group_choice")
-    
-    words_per_group = max(1, len(words_df) // 13)
-    start_idx = (group_num - 1) * words_per_group
-    end_idx = start_idx + words_per_group if group_num < 13 else len(words_df)
-    
-    current_group = words_df.iloc[start_idx:end_idx].reset_index(drop=True)
+    group_num = st.selectbox(f"Select Learning Group (1-{words.num_groups}):", range(1, words.num_groups + 1),
+                             key="learn_group_choice", on_change=reset_learn_page)
+
+    current_group = words.group(group_num)
+
+    col_search, col_size = st.columns([3, 1])
+    with col_search:
+        search = st.text_input("🔍 Search this group:", key="learn_search", on_change=reset_learn_page)
+    with col_size:
+        page_size = st.selectbox("Words per page:", LEARN_PAGE_SIZES, key="learn_page_size", on_change=reset_learn_page)
+
+    needle = search.strip().lower()
+    if needle:
+        current_group = [i for i in current_group if needle in words.words[i].lower()]
+
+    total_pages = max(1, -(-len(current_group) // page_size))
+    if st.session_state.get("learn_page", 1) > total_pages:
+        st.session_state.learn_page = 1
+
+    # First page on which each initial letter appears
+    letter_pages = {}
+    for pos, i in enumerate(current_group):
+        letter_pages.setdefault(word_store.initial(words.words[i]), pos // page_size + 1)
+
+    col_letter, col_page = st.columns([3, 1])
+    with col_letter:
+        st.selectbox("Jump to letter:", sorted(letter_pages), index=None, placeholder="A–Z",
+                     key="learn_letter", on_change=jump_to_letter, args=(letter_pages,))
+    with col_page:
+        page = st.number_input("Page:", min_value=1, max_value=total_pages, step=1, key="learn_page")
+
+    page_start = (page - 1) * page_size
+    page_ids = current_group[page_start:page_start + page_size]
+    if len(current_group):
+        st.caption(f"Showing {page_start + 1}–{page_start + len(page_ids)} of {len(current_group)} words")
+    else:
+        st.info("No words match your search.")
     
     st.divider()
 
-    for idx, row in current_group.iterrows():
+    for idx in page_ids:
         col_text, col_audio = st.columns([3, 1])
         
-        word_to_read = str(row['word']).replace('.0', '').strip()
+        word_to_read = words.words[idx].replace('.0', '').strip()
 
         with col_text:
             st.markdown(f"### {word_to_read}")
-            st.write(f"**Meaning:** {row['definition']}")
+            st.write(f"**Meaning:** {words.definitions[idx]}")
         
         with col_audio:
             if st.button(f"🔊 Listen", key=f"study_btn_{idx}"):
-                audio_io_learn = io.BytesIO()
-                gTTS(text=word_to_read, lang="en").write_to_fp(audio_io_learn)
-                st.audio(audio_io_learn, format="audio/mp3", autoplay=True)
+                try:
+                    with perf_trace.span("learn.tts"):
+                        show_audio(word_to_read, autoplay=True)
+                except tts_backends.TTSError:
+                    st.warning("🔇 Audio unavailable.")
         
         st.divider()
 
 # --- TAB 3: MY PROGRESS ---
-with tab_stats:
+with tab_stats, perf_trace.span("tab.stats"):
     st.header("📊 My Progress")
-    conn = get_db_connection()
-    try:
-        st.subheader("❌ Words to Review")
-        bad_df = pd.read_sql_query("""
-            SELECT word, COUNT(*) as mistakes, MAX(date) as last_fail 
-            FROM scores WHERE correctly_spelled = 0 
-            GROUP BY word ORDER BY mistakes DESC
-        """, conn)
-
-        if not bad_df.empty:
-            st.dataframe(bad_df, use_container_width=True)
-            if st.button("🎯 Practice These Incorrect Words Now"):
-                st.session_state.exam_mode = "❌ Incorrect Words Only"
-                st.session_state.current_word = None
-                st.success("Practice mode updated! Switch to 'Daily Exam' to begin.")
-        else:
-            st.success("No mistakes yet! You're doing great, Vivian!")
+    st.subheader("❌ Words to Review")
+    with perf_trace.span("stats.words_to_review"):
+        bad_rows = cached_derived(
+            "words_to_review", (db.data_version(), user_id),
+            lambda: [tuple(r) for r in db.words_to_review(user_id)],
+        )
 
-        st.divider()
-        st.subheader("🗑️ Reset All Data")
-        confirm = st.checkbox("I am sure I want to delete all my history.")
-        if st.button("Reset Everything", disabled=not confirm):
-            conn.execute("DELETE FROM scores")
-            conn.execute("DELETE FROM daily_exam_progress")
-            conn.commit()
-            st.rerun()
-    finally:
-        conn.close()
+    if bad_rows:
+        import pandas as pd  # only needed once there is something to tabulate
+        st.dataframe(pd.DataFrame(bad_rows, columns=["word", "mistakes", "last_fail"]), use_container_width=True)
+        if st.button("🎯 Practice These Incorrect Words Now"):
+            st.session_state.exam_mode = "❌ Incorrect Words Only"
+            st.session_state.current_word = None
+            st.session_state.deck = None
+            st.success("Practice mode updated! Switch to 'Daily Exam' to begin.")
+    else:
+        st.success("No mistakes yet! You're doing great, Vivian!")
+
+    st.divider()
+    with st.expander("🗄️ Compact Old History"):
+        st.write("Moves your raw attempts older than the window below to an archive file. "
+                 "Daily totals and review stats are kept.")
+        keep_days = st.number_input("Keep raw attempts for (days):", min_value=1, value=db.COMPACT_KEEP_DAYS)
+        if st.button("Compact Now"):
+            answer_log.flush()
+            result = db.compact_history(int(keep_days), user_id=user_id)
+            st.success(f"Archived {result['rows_compacted']} attempts from before {result['cutoff']}.")
+
+    st.divider()
+    st.subheader("🗑️ Reset All Data")
+    confirm = st.checkbox("I am sure I want to delete all my history.")
+    if st.button("Reset Everything", disabled=not confirm):
+        answer_log.flush()
+        db.reset_all(user_id)
+        rerun()
 
+# --- DEBUG PANEL ---
+# Time to first render: the first run in this process includes importing the
+# app's modules, opening the DB and loading the word list
+render_ms = (time.perf_counter() - _SCRIPT_START) * 1000
+perf_trace.record_startup(render_ms)
+st.session_state.setdefault("first_render_ms", render_ms)
+trace = perf_trace.finish_trace()
+with st.sidebar:
+    st.checkbox("🛠 Show performance trace", key="debug_trace")
+    if trace is not None:
+        with st.expander(f"Rerun #{trace.rerun}: {trace.total * 1000:.1f} ms", expanded=True):
+            cold_ms = perf_trace.startup_ms()
+            status = "✅" if cold_ms <= STARTUP_TARGET_MS else "⚠️"
+            st.caption(f"{status} Cold start to first render: {cold_ms:.0f} ms (target {STARTUP_TARGET_MS:.0f} ms)")
+            st.caption(f"This session's first render: {st.session_state.first_render_ms:.0f} ms")
+            import pandas as pd
+            st.dataframe(
+                pd.DataFrame(trace.to_dict()["spans"], columns=["name", "offset_ms", "ms"]),
+                hide_index=True,
+            )
+            st.json(trace.counters)
+            st.caption(f"Trace log: {perf_trace.TRACE_FILE}")
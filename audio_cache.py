@@ -0,0 +1,121 @@
+"""
+Persistent on-disk cache for synthesized word audio.
+
+Entries are content-addressed by (word, lang, engine), so a word that has
+already been spoken costs one local file read instead of a TTS round trip.
+The cache is capped in size and evicts least-recently-used entries.
+"""
+import hashlib
+import os
+import threading
+import time
+
+import lru_dir
+import perf_trace
+import tts_backends
+
+AUDIO_CACHE_DIR = os.environ.get("SPELLINGBEE_AUDIO_CACHE", ".audio_cache")
+AUDIO_CACHE_MAX_BYTES = int(os.environ.get("SPELLINGBEE_AUDIO_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+AUDIO_EXT = ".audio"  # engines differ in format; see tts_backends.audio_format
+# Serve only audio built ahead of time (see presynth.py); a miss raises TTSError instead of synthesizing
+PREBUILT_ONLY = os.environ.get("SPELLINGBEE_AUDIO_PREBUILT_ONLY", "") not in ("", "0")
+# A word cached from a fallback engine retries the preferred engines this often
+FALLBACK_RETRY_SECONDS = float(os.environ.get("SPELLINGBEE_AUDIO_FALLBACK_RETRY", 600))
+
+_store = lru_dir.LRUDirectory(AUDIO_CACHE_DIR, [AUDIO_EXT], AUDIO_CACHE_MAX_BYTES)
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+_fallback_tried = {}  # (word, lang) -> time.monotonic() the preferred engines last failed
+
+
+def cache_key(word, lang="en", engine="gtts"):
+    """Return the content address for a (word, lang, engine) triple."""
+    raw = "\0".join([engine, lang, str(word).strip()]).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+def contains(key):
+    """Return True if a key is cached, without touching hit/miss counters."""
+    return _store.contains(key + AUDIO_EXT)
+
+
+def _count(hit):
+    with _lock:
+        _stats["hits" if hit else "misses"] += 1
+    perf_trace.count("audio_cache_hits" if hit else "audio_cache_misses")
+
+
+def put(key, data):
+    """Atomically store audio bytes under a key, evicting old entries if needed."""
+    _store.put(key + AUDIO_EXT, data)
+
+
+def _find(word, lang, engines):
+    """Return (audio, chain position) of the first engine with cached audio, or (None, len(chain))."""
+    chain = engines or tts_backends.TTS_ENGINES
+    for pos, engine in enumerate(chain):
+        data = _store.read(cache_key(word, lang, engine) + AUDIO_EXT)
+        if data is not None:
+            return data, pos
+    return None, len(chain)
+
+
+def _retry_due(word, lang, engines, pos):
+    """True if audio from chain position pos should give a preferred engine another try."""
+    if PREBUILT_ONLY or not tts_backends.engine_chain((engines or tts_backends.TTS_ENGINES)[:pos]):
+        return False
+    with _lock:
+        failed_at = _fallback_tried.get((str(word), lang))
+    return failed_at is None or time.monotonic() - failed_at >= FALLBACK_RETRY_SECONDS
+
+
+def lookup(word, lang="en", engines=None):
+    """Return cached audio for a word from any engine in the chain, or None."""
+    return _find(word, lang, engines)[0]
+
+
+def is_cached(word, lang="en", engines=None):
+    """Return True if get_audio() would serve a word from the cache without synthesizing."""
+    chain = engines or tts_backends.TTS_ENGINES
+    for pos, engine in enumerate(chain):
+        if contains(cache_key(word, lang, engine)):
+            return pos == 0 or not _retry_due(word, lang, chain, pos)
+    return False
+
+
+def get_audio(word, lang="en", engines=None):
+    """Return audio bytes for a word, synthesizing and caching on a miss.
+
+    Audio cached from a fallback engine is served until FALLBACK_RETRY_SECONDS
+    after the preferred engines last failed, then they are tried again.
+    Raises tts_backends.TTSError if nothing is cached and every engine fails,
+    or on any miss when PREBUILT_ONLY is set.
+    """
+    chain = engines or tts_backends.TTS_ENGINES
+    data, pos = _find(word, lang, chain)
+    _count(data is not None)
+    if data is not None and (pos == 0 or not _retry_due(word, lang, chain, pos)):
+        return data
+    if data is None and PREBUILT_ONLY:
+        raise tts_backends.TTSError(f"No pre-synthesized audio for {word!r}")
+    try:
+        fresh, engine = tts_backends.synthesize(word, lang, chain[:pos])
+    except tts_backends.TTSError:
+        if data is None:
+            raise
+        fresh, engine = data, None
+    with _lock:
+        if engine == chain[0]:
+            _fallback_tried.pop((str(word), lang), None)
+        else:
+            _fallback_tried[(str(word), lang)] = time.monotonic()
+    if engine is not None:
+        put(cache_key(word, lang, engine), fresh)
+    return fresh
+
+
+def cache_stats():
+    """Return hit/miss/eviction counters and current cache size."""
+    entries, size = _store.stats()
+    with _lock:
+        return dict(_stats, evictions=_store.evictions, entries=entries, bytes=size)
@@ -0,0 +1,312 @@
+"""
+Headless performance benchmarks for app.py and the data layer.
+
+Drives the real app through Streamlit's AppTest API with the stub TTS
+engine, against synthetic word lists and synthetic scores histories, and
+writes the results as JSON so runs can be compared for regressions.
+
+Usage:
+  python benchmarks/run_benchmarks.py                       # default sizes
+  python benchmarks/run_benchmarks.py --words 1000 10000 --history 100000 1000000
+  python benchmarks/run_benchmarks.py --out new.json --compare old.json
+
+Note: Streamlit executes every tab's code on each rerun, so the per-tab
+numbers measure a full rerun triggered by an interaction in that tab.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import sqlite3
+import statistics
+import string
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORK_DIR = tempfile.mkdtemp(prefix="spellingbee-bench-")
+
+# Must be set before the app's modules are imported
+os.environ["SPELLINGBEE_TTS_ENGINES"] = "stub"
+os.environ["SPELLINGBEE_AUDIO_CACHE"] = os.path.join(WORK_DIR, "audio")
+os.environ["SPELLINGBEE_STATIC_AUDIO_DIR"] = os.path.join(WORK_DIR, "static_audio")
+os.environ["SPELLINGBEE_DB"] = os.path.join(WORK_DIR, "bench.db")
+sys.path.insert(0, REPO_ROOT)
+
+import db  # noqa: E402
+import word_store  # noqa: E402
+
+APP_PATH = os.path.join(REPO_ROOT, "app.py")
+NUM_STUDENTS = 20
+INSERT_BATCH = 50_000
+
+
+# --- SYNTHETIC DATA ---
+def make_words(n, rng):
+    """Return n unique lowercase pseudo-words."""
+    words = set()
+    while len(words) < n:
+        words.add("".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12))))
+    return sorted(words)
+
+
+def write_word_list(words, fmt, rng):
+    import pandas as pd
+    df = pd.DataFrame({
+        "Word": words,
+        "Definition": [f"A synthetic definition number {rng.randint(0, 10**6)}." for _ in words],
+    })
+    path = os.path.join(WORK_DIR, f"words_{len(words)}.{fmt}")
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    else:
+        df.to_excel(path, index=False)
+    return path
+
+
+def make_history(db_path, words, rows, rng):
+    """Create a migrated DB holding `rows` synthetic attempts spread over NUM_STUDENTS."""
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    db.close_all()
+    db.DB_PATH = db_path
+    db.init_db()
+    start = date.today() - timedelta(days=3 * 365)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    done = 0
+    while done < rows:
+        batch = min(INSERT_BATCH, rows - done)
+        conn.executemany(
+            "INSERT INTO scores (user_id, date, word, correctly_spelled, attempts) VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    f"student{rng.randrange(NUM_STUDENTS)}",
+                    (start + timedelta(days=rng.randrange(3 * 365))).isoformat(),
+                    rng.choice(words),
+                    int(rng.random() < 0.8),
+                    rng.randint(1, 3),
+                )
+                for _ in range(batch)
+            ),
+        )
+        conn.commit()
+        done += batch
+    conn.close()
+    db.rebuild_word_stats()
+
+
+# --- MEASUREMENT ---
+def summarize(samples):
+    samples = sorted(samples)
+    if not samples:
+        return {}
+    p99_index = min(len(samples) - 1, int(round(0.99 * (len(samples) - 1))))
+    return {
+        "n": len(samples),
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p99_ms": round(samples[p99_index] * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+    }
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def bench_load_words(path, repeats):
+    """Cold = no snapshot on disk; warm = snapshot present."""
+    snapshot_dir = os.path.join(WORK_DIR, "word_cache")
+    word_store.SNAPSHOT_DIR = snapshot_dir
+    cold, warm = [], []
+    peak = 0
+    for _ in range(repeats):
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+        tracemalloc.start()
+        cold.append(timed(lambda: word_store.load_word_table(path)))
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        warm.append(timed(lambda: word_store.load_word_table(path)))
+    return {"cold": summarize(cold), "warm": summarize(warm), "cold_peak_mb": round(peak / 2**20, 2)}
+
+
+COLD_START_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest  # the server has Streamlit loaded already
+at = AppTest.from_file(sys.argv[1], default_timeout=600)
+t0 = time.perf_counter()
+at.run()
+print(json.dumps({
+    "first_render_ms": (time.perf_counter() - t0) * 1000,
+    "error": str(at.exception[0].message) if at.exception else None,
+    "heavy_imports": sorted(m for m in ("pandas", "openpyxl", "gtts", "numpy") if m in sys.modules),
+}))
+"""
+
+
+def bench_cold_start(data_path, repeats):
+    """Time-to-first-render of a fresh interpreter running the app, with the word snapshot warm."""
+    env = dict(os.environ, SPELLINGBEE_DATA_FILE=data_path, SPELLINGBEE_WORD_CACHE=word_store.SNAPSHOT_DIR)
+    samples, heavy = [], []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", COLD_START_SCRIPT, APP_PATH],
+                             capture_output=True, text=True, env=env, cwd=REPO_ROOT, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        if result["error"]:
+            raise RuntimeError(f"App raised: {result['error']}")
+        samples.append(result["first_render_ms"] / 1000)
+        heavy = result["heavy_imports"]
+    return {"first_render": summarize(samples), "heavy_imports": heavy}
+
+
+def bench_app(data_path, store, reruns):
+    from streamlit.testing.v1 import AppTest
+    import streamlit as st
+
+    os.environ["SPELLINGBEE_DATA_FILE"] = data_path
+    st.cache_resource.clear()
+    results = {}
+
+    at = AppTest.from_file(APP_PATH, default_timeout=600)
+    at.query_params["student"] = "student0"
+    results["first_render_s"] = round(timed(at.run), 4)
+    if at.exception:
+        raise RuntimeError(f"App raised: {at.exception}")
+
+    results["exam_idle_rerun"] = summarize([timed(at.run) for _ in range(reruns)])
+
+    submit = []
+    for k in range(reruns):
+        word = store.words[at.session_state.current_word]
+        at.text_input[0].input(word if k % 2 else word + "x")
+        check = next(b for b in at.button if b.label == "Check")
+        submit.append(timed(check.click().run))
+    results["exam_submit"] = summarize(submit)
+
+    page_turns = []
+    for _ in range(reruns):
+        page = at.number_input(key="learn_page")
+        if page.value >= page.max:
+            page.set_value(1)
+        else:
+            page.increment()
+        page_turns.append(timed(at.run))
+    results["learn_page_turn"] = summarize(page_turns)
+
+    results["learn_search"] = summarize([
+        timed(at.text_input(key="learn_search").input(prefix).run) for prefix in ["a", "ab", "abc", ""]
+    ])
+
+    # My Progress tab: the wrong answers above guarantee the practice button is shown
+    practice = []
+    for _ in range(reruns):
+        button = next(b for b in at.button if b.label == "🎯 Practice These Incorrect Words Now")
+        practice.append(timed(button.click().run))
+    results["stats_practice"] = summarize(practice)
+    return results
+
+
+def bench_db(store, reruns, rng):
+    today = date.today().isoformat()
+    users = [f"student{i}" for i in range(NUM_STUDENTS)]
+    return {
+        "record_answer": summarize([
+            timed(lambda: db.record_answer(rng.choice(users), today, rng.choice(store.words), rng.random() < 0.8, 1))
+            for _ in range(reruns)
+        ]),
+        "words_to_review": summarize([timed(lambda: db.words_to_review(rng.choice(users))) for _ in range(reruns)]),
+        "incorrect_words": summarize([timed(lambda: db.incorrect_words(rng.choice(users))) for _ in range(reruns)]),
+        "today_correct_count": summarize([
+            timed(lambda: db.today_correct_count(rng.choice(users), today)) for _ in range(reruns)
+        ]),
+    }
+
+
+# --- REPORTING ---
+def compare(current, baseline_path, threshold):
+    """Print p50 metrics that regressed by more than threshold (a fraction) vs a saved run."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    def flatten(d, prefix=""):
+        for k, v in d.items():
+            if isinstance(v, dict):
+                yield from flatten(v, f"{prefix}{k}.")
+            elif k.endswith("_ms") or k.endswith("_s") or k.endswith("_mb"):
+                yield f"{prefix}{k}", v
+
+    old = dict(flatten(baseline["results"]))
+    regressions = 0
+    for key, new_value in flatten(current["results"]):
+        if key in old and old[key] and ".p99_ms" not in key and ".max_ms" not in key:
+            change = (new_value - old[key]) / old[key]
+            if change > threshold:
+                regressions += 1
+                print(f"REGRESSION {key}: {old[key]} -> {new_value} (+{change:.0%})")
+    print(f"\n{regressions} regression(s) above {threshold:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--history", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--format", choices=["csv", "xlsx"], default="csv")
+    parser.add_argument("--reruns", type=int, default=30)
+    parser.add_argument("--load-repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=2026)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", help="previous results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="regression threshold as a fraction")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "args": vars(args),
+        "results": {},
+    }
+    try:
+        for n_words in args.words:
+            words = make_words(n_words, rng)
+            data_path = write_word_list(words, args.format, rng)
+            load = bench_load_words(data_path, args.load_repeats)
+            store = word_store.WordStore.from_frame(word_store.load_word_table(data_path))
+            for n_rows in args.history:
+                label = f"words={n_words},history={n_rows}"
+                print(f"--- {label}")
+                t0 = time.perf_counter()
+                make_history(os.path.join(WORK_DIR, f"history_{n_rows}.db"), words, n_rows, rng)
+                entry = {"history_build_s": round(time.perf_counter() - t0, 2), "load_words": load}
+                entry["db"] = bench_db(store, args.reruns, rng)
+                entry["app"] = bench_app(data_path, store, args.reruns)
+                entry["cold_start"] = bench_cold_start(data_path, args.load_repeats)
+                report["results"][label] = entry
+                print(json.dumps(entry, indent=2))
+        report["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    finally:
+        db.close_all()
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nPeak RSS: {report['peak_rss_mb']} MB\nResults written to {args.out}")
+
+    if args.compare:
+        sys.exit(1 if compare(report, args.compare, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
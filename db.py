@@ -0,0 +1,456 @@
+"""
+SQLite access for the app.
+
+Connections are pooled and reused across reruns instead of being opened per
+query. Each one is put in WAL mode so readers never block the writer, and
+keeps sqlite3's prepared-statement cache warm for the fixed SQL below.
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import perf_trace
+
+DB_PATH = os.environ.get("SPELLINGBEE_DB", "scores.db")
+POOL_SIZE = int(os.environ.get("SPELLINGBEE_DB_POOL_SIZE", 8))
+BUSY_TIMEOUT_MS = 5000
+WRITE_RETRIES = 5
+DEFAULT_USER = "default"
+ARCHIVE_PATH = os.environ.get("SPELLINGBEE_ARCHIVE_DB", "scores_archive.db")
+COMPACT_KEEP_DAYS = 90
+STATEMENT_CACHE_SIZE = 128
+
+_pool = queue.LifoQueue(maxsize=POOL_SIZE)
+
+# Bumped after every committed write so callers can cache derived reads
+_data_version = 0
+_version_lock = threading.Lock()
+
+
+def data_version():
+    """Return a counter that changes whenever this process writes to the database."""
+    return _data_version
+
+
+def bump_version():
+    """Advance the data version after a write and return it."""
+    global _data_version
+    with _version_lock:
+        _data_version += 1
+        return _data_version
+
+
+def _open():
+    conn = sqlite3.connect(
+        DB_PATH,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False,  # connections move between Streamlit script threads via the pool
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+
+@contextmanager
+def connection():
+    """Borrow a pooled connection; it is returned to the pool (or closed if full) afterwards."""
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        conn = _open()
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        if conn.in_transaction:
+            conn.commit()
+    finally:
+        try:
+            _pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+@contextmanager
+def transaction():
+    """Borrow a connection inside a BEGIN IMMEDIATE write transaction.
+
+    Taking the write lock up front means concurrent writers queue on
+    busy_timeout instead of failing with "database is locked" when a
+    deferred read lock cannot be upgraded. Lock contention beyond the
+    timeout is retried with backoff.
+    """
+    with connection() as conn:
+        for attempt in range(WRITE_RETRIES):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                break
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) or attempt == WRITE_RETRIES - 1:
+                    raise
+                time.sleep(0.05 * 2 ** attempt)
+        yield conn
+
+
+def close_all():
+    """Close every idle pooled connection."""
+    while True:
+        try:
+            _pool.get_nowait().close()
+        except queue.Empty:
+            return
+
+
+# --- SQL ---
+# Kept as module constants so every call reuses the same cached prepared statement.
+SQL_INCORRECT_WORDS = "SELECT word FROM word_stats WHERE user_id = ? AND mistakes > 0"
+SQL_TODAY_CORRECT = "SELECT correct_count FROM daily_exam_progress WHERE user_id = ? AND date = ?"
+SQL_INSERT_SCORE = "INSERT INTO scores (user_id, date, word, correctly_spelled, attempts) VALUES (?, ?, ?, ?, ?)"
+SQL_PROGRESS_CORRECT = (
+    "INSERT INTO daily_exam_progress (user_id, date, correct_count, total_attempted) VALUES (?, ?, 1, 1) "
+    "ON CONFLICT(user_id, date) DO UPDATE SET correct_count = correct_count + 1, total_attempted = total_attempted + 1"
+)
+SQL_PROGRESS_INCORRECT = (
+    "INSERT INTO daily_exam_progress (user_id, date, total_attempted) VALUES (?, ?, 1) "
+    "ON CONFLICT(user_id, date) DO UPDATE SET total_attempted = total_attempted + 1"
+)
+SQL_UPDATE_WORD_STATS = """
+    INSERT INTO word_stats (user_id, word, mistakes, correct_count, last_fail, last_attempt)
+    VALUES (:user_id, :word, 1 - :correct, :correct, CASE WHEN :correct THEN NULL ELSE :date END, :date)
+    ON CONFLICT(user_id, word) DO UPDATE SET
+        mistakes = mistakes + 1 - :correct,
+        correct_count = correct_count + :correct,
+        last_fail = CASE WHEN :correct THEN last_fail ELSE MAX(COALESCE(last_fail, ''), :date) END,
+        last_attempt = MAX(COALESCE(last_attempt, ''), :date)
+"""
+SQL_LOAD_SCHEDULE = "SELECT word, box, due FROM review_schedule WHERE user_id = ?"
+SQL_DUE_WORDS = "SELECT word FROM review_schedule WHERE user_id = ? AND due <= ?"
+SQL_SAVE_SCHEDULE = (
+    "INSERT INTO review_schedule (user_id, word, box, due) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(user_id, word) DO UPDATE SET box = excluded.box, due = excluded.due"
+)
+SQL_WORDS_TO_REVIEW = """
+    SELECT word, mistakes, last_fail
+    FROM word_stats WHERE user_id = ? AND mistakes > 0
+    ORDER BY mistakes DESC
+"""
+
+
+def init_db():
+    with connection() as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS scores (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT NOT NULL,
+                word TEXT NOT NULL,
+                correctly_spelled INTEGER NOT NULL,
+                attempts INTEGER NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS daily_exam_progress (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT NOT NULL UNIQUE,
+                correct_count INTEGER DEFAULT 0,
+                total_attempted INTEGER DEFAULT 0
+            )
+        """)
+        migrate(conn)
+
+
+def _migration_word_stats(conn):
+    """Per-word rollup so the review views never scan the scores history."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS word_stats (
+            word TEXT PRIMARY KEY,
+            mistakes INTEGER NOT NULL DEFAULT 0,
+            correct_count INTEGER NOT NULL DEFAULT 0,
+            last_fail TEXT,
+            last_attempt TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_word_stats_mistakes ON word_stats (mistakes DESC) WHERE mistakes > 0")
+    conn.execute("DELETE FROM word_stats")
+    conn.execute("""
+        INSERT INTO word_stats (word, mistakes, correct_count, last_fail, last_attempt)
+        SELECT word,
+               SUM(correctly_spelled = 0),
+               SUM(correctly_spelled != 0),
+               MAX(CASE WHEN correctly_spelled = 0 THEN date END),
+               MAX(date)
+        FROM scores GROUP BY word
+    """)
+
+
+def _migration_user_id(conn):
+    """Partition history by student; existing rows belong to DEFAULT_USER."""
+    conn.execute(f"ALTER TABLE scores ADD COLUMN user_id TEXT NOT NULL DEFAULT '{DEFAULT_USER}'")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scores_user_date ON scores (user_id, date)")
+
+    # SQLite cannot change a UNIQUE constraint in place, so rebuild the table
+    conn.execute(f"""
+        CREATE TABLE daily_exam_progress_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL DEFAULT '{DEFAULT_USER}',
+            date TEXT NOT NULL,
+            correct_count INTEGER DEFAULT 0,
+            total_attempted INTEGER DEFAULT 0,
+            UNIQUE (user_id, date)
+        )
+    """)
+    conn.execute("""
+        INSERT INTO daily_exam_progress_new (id, date, correct_count, total_attempted)
+        SELECT id, date, correct_count, total_attempted FROM daily_exam_progress
+    """)
+    conn.execute("DROP TABLE daily_exam_progress")
+    conn.execute("ALTER TABLE daily_exam_progress_new RENAME TO daily_exam_progress")
+
+    conn.execute("DROP TABLE IF EXISTS word_stats")
+    conn.execute("""
+        CREATE TABLE word_stats (
+            user_id TEXT NOT NULL,
+            word TEXT NOT NULL,
+            mistakes INTEGER NOT NULL DEFAULT 0,
+            correct_count INTEGER NOT NULL DEFAULT 0,
+            last_fail TEXT,
+            last_attempt TEXT,
+            PRIMARY KEY (user_id, word)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE INDEX idx_word_stats_user_mistakes
+        ON word_stats (user_id, mistakes DESC) WHERE mistakes > 0
+    """)
+    _backfill_word_stats(conn)
+
+
+def _backfill_word_stats(conn, include_daily=False):
+    # Normalize raw attempts and compacted daily rollups to (user, word, date, attempts, correct)
+    source = "SELECT user_id, word, date, 1 AS n, correctly_spelled != 0 AS c FROM scores"
+    if include_daily:
+        source += " UNION ALL SELECT user_id, word, date, attempts, correct_count FROM scores_daily"
+    conn.execute("DELETE FROM word_stats")
+    conn.execute(f"""
+        INSERT INTO word_stats (user_id, word, mistakes, correct_count, last_fail, last_attempt)
+        SELECT user_id, word,
+               SUM(n - c),
+               SUM(c),
+               MAX(CASE WHEN n > c THEN date END),
+               MAX(date)
+        FROM ({source}) GROUP BY user_id, word
+    """)
+
+
+def _migration_scores_date_index(conn):
+    """Covering index for date-ranged analytics (view_db.py stats)."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scores_date_word ON scores (date, word, correctly_spelled)")
+
+
+def _migration_scores_daily(conn):
+    """Per-student, per-word, per-day rollup that compacted raw attempts are folded into."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS scores_daily (
+            user_id TEXT NOT NULL,
+            date TEXT NOT NULL,
+            word TEXT NOT NULL,
+            attempts INTEGER NOT NULL,
+            correct_count INTEGER NOT NULL,
+            PRIMARY KEY (user_id, date, word)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scores_daily_date ON scores_daily (date)")
+
+
+def _migration_review_schedule(conn):
+    """Spaced-repetition state: one row per student and word, indexed by due time."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS review_schedule (
+            user_id TEXT NOT NULL,
+            word TEXT NOT NULL,
+            box INTEGER NOT NULL,
+            due INTEGER NOT NULL,
+            PRIMARY KEY (user_id, word)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_review_schedule_due ON review_schedule (user_id, due)")
+
+
+# Applied in order; PRAGMA user_version records how many have run.
+MIGRATIONS = [
+    _migration_word_stats,
+    _migration_user_id,
+    _migration_scores_date_index,
+    _migration_scores_daily,
+    _migration_review_schedule,
+]
+
+
+def migrate(conn):
+    """Run any migrations this database has not seen yet."""
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= len(MIGRATIONS):
+        return
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    # Re-check under the write lock in case another process just migrated
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for step in MIGRATIONS[version:]:
+        step(conn)
+    conn.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+    conn.commit()
+
+
+def incorrect_words(user_id):
+    perf_trace.count("db_queries")
+    with connection() as conn:
+        return [row["word"] for row in conn.execute(SQL_INCORRECT_WORDS, (user_id,))]
+
+
+def today_correct_count(user_id, today_date):
+    perf_trace.count("db_queries")
+    with connection() as conn:
+        row = conn.execute(SQL_TODAY_CORRECT, (user_id, today_date)).fetchone()
+    return row[0] if row else 0
+
+
+def record_answer(user_id, today_date, word, is_correct, attempts, schedule=None):
+    """Insert a scores row and bump daily progress and word_stats in one transaction.
+
+    schedule, if given, is the word's new (box, due) and is saved in the same
+    transaction. Returns the new data version.
+    """
+    return record_answers([(user_id, today_date, word, is_correct, attempts, schedule)])
+
+
+def record_answers(events):
+    """Apply many (user_id, date, word, is_correct, attempts, schedule) answers in one transaction.
+
+    schedule is a (box, due) pair to upsert into review_schedule, or None.
+    Returns the new data version.
+    """
+    perf_trace.count("db_queries", 3)
+    with transaction() as conn:
+        conn.executemany(SQL_INSERT_SCORE, [(u, d, w, int(c), a) for u, d, w, c, a, _ in events])
+        conn.executemany(SQL_PROGRESS_CORRECT, [(u, d) for u, d, _, c, _, _ in events if c])
+        conn.executemany(SQL_PROGRESS_INCORRECT, [(u, d) for u, d, _, c, _, _ in events if not c])
+        conn.executemany(SQL_UPDATE_WORD_STATS, [
+            {"user_id": u, "word": w, "correct": int(c), "date": d} for u, d, w, c, _, _ in events
+        ])
+        conn.executemany(SQL_SAVE_SCHEDULE, [(u, w, *s) for u, _, w, _, _, s in events if s is not None])
+    return bump_version()
+
+
+def load_schedule(user_id):
+    """Return {word: (box, due)} for every word this student has been graded on."""
+    perf_trace.count("db_queries")
+    with connection() as conn:
+        return {row["word"]: (row["box"], row["due"]) for row in conn.execute(SQL_LOAD_SCHEDULE, (user_id,))}
+
+
+def due_words(user_id, now):
+    """Return words whose review is due by `now` (epoch seconds)."""
+    perf_trace.count("db_queries")
+    with connection() as conn:
+        return [row["word"] for row in conn.execute(SQL_DUE_WORDS, (user_id, now))]
+
+
+def words_to_review(user_id):
+    """Return (word, mistakes, last_fail) rows, most-missed first."""
+    perf_trace.count("db_queries")
+    with connection() as conn:
+        return conn.execute(SQL_WORDS_TO_REVIEW, (user_id,)).fetchall()
+
+
+def rebuild_word_stats():
+    """Recompute the word_stats rollup from scores and compacted history, e.g. after a bulk import."""
+    with transaction() as conn:
+        _backfill_word_stats(conn, include_daily=True)
+    bump_version()
+
+
+def compact_history(keep_days=COMPACT_KEEP_DAYS, archive_path=ARCHIVE_PATH, today=None, user_id=None):
+    """Fold raw attempts older than keep_days into scores_daily and archive them.
+
+    Raw rows are copied to the archive database, rolled up per student, word
+    and day, then deleted from the live DB. With user_id only that student's
+    rows are touched; a run over every student also vacuums and analyzes the
+    DB. word_stats is cumulative and is left as is. Archive inserts are
+    idempotent by id, so an interrupted run can simply be repeated.
+    Returns a summary dict.
+    """
+    cutoff = ((today or date.today()) - timedelta(days=keep_days)).isoformat()
+    where, params = "date < ?", (cutoff,)
+    if user_id is not None:
+        where, params = "date < ? AND user_id = ?", (cutoff, user_id)
+    size_before = os.path.getsize(DB_PATH) if os.path.exists(DB_PATH) else 0
+    conn = _open()
+    try:
+        conn.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS archive.scores (
+                id INTEGER PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                date TEXT NOT NULL,
+                word TEXT NOT NULL,
+                correctly_spelled INTEGER NOT NULL,
+                attempts INTEGER NOT NULL
+            )
+        """)
+        # Commit the archive copy on its own first: SQLite does not make a
+        # transaction spanning an ATTACHed DB atomic in WAL mode, so the
+        # live rows are only deleted once their copy is durable
+        conn.execute("BEGIN IMMEDIATE")
+        archived = conn.execute(f"""
+            INSERT OR IGNORE INTO archive.scores (id, user_id, date, word, correctly_spelled, attempts)
+            SELECT id, user_id, date, word, correctly_spelled, attempts FROM scores WHERE {where}
+        """, params).rowcount
+        conn.commit()
+        conn.execute("DETACH DATABASE archive")
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(f"""
+            INSERT INTO scores_daily (user_id, date, word, attempts, correct_count)
+            SELECT user_id, date, word, COUNT(*), SUM(correctly_spelled != 0)
+            FROM scores WHERE {where} GROUP BY user_id, date, word
+            ON CONFLICT(user_id, date, word) DO UPDATE SET
+                attempts = attempts + excluded.attempts,
+                correct_count = correct_count + excluded.correct_count
+        """, params)
+        compacted = conn.execute(f"DELETE FROM scores WHERE {where}", params).rowcount
+        conn.commit()
+        if user_id is None:
+            # Rewrites the whole file, so only for an all-students maintenance run
+            conn.execute("VACUUM")
+            conn.execute("ANALYZE")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    bump_version()
+    return {
+        "cutoff": cutoff,
+        "rows_compacted": compacted,
+        "rows_archived": archived,
+        "archive_path": archive_path,
+        "bytes_before": size_before,
+        "bytes_after": os.path.getsize(DB_PATH),
+    }
+
+
+def reset_all(user_id):
+    """Delete one student's history."""
+    with transaction() as conn:
+        conn.execute("DELETE FROM scores WHERE user_id = ?", (user_id,))
+        conn.execute("DELETE FROM daily_exam_progress WHERE user_id = ?", (user_id,))
+        conn.execute("DELETE FROM word_stats WHERE user_id = ?", (user_id,))
+        conn.execute("DELETE FROM scores_daily WHERE user_id = ?", (user_id,))
+        conn.execute("DELETE FROM review_schedule WHERE user_id = ?", (user_id,))
+    bump_version()
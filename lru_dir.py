@@ -0,0 +1,136 @@
+"""
+Size-capped directories of files with least-recently-used eviction.
+
+LRUDirectory indexes the files in one directory by name, oldest use first,
+and deletes the least recently used ones once their total size passes a
+cap. The directory is scanned once, lazily, ordered by mtime, and reads
+bump mtime, so the LRU order survives a process restart. A file another
+process writes later is picked up the first time it is looked for.
+atomic_write() replaces a file so readers never see it half-written.
+"""
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+def atomic_write(path, data):
+    """Write bytes to path via a temp file in the same directory and os.replace()."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class LRUDirectory:
+    """Files under directory whose names end in one of suffixes, capped at max_bytes in total.
+
+    The file just written is never evicted, even if it alone exceeds the cap.
+    """
+
+    def __init__(self, directory, suffixes, max_bytes):
+        self.directory = directory
+        self.suffixes = tuple(suffixes)
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._index = None  # OrderedDict of file name -> size in bytes, oldest first
+        self._total_bytes = 0
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _load_locked(self):
+        if self._index is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.suffixes):
+                continue
+            try:
+                st = os.stat(self.path(name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, name, st.st_size))
+        entries.sort()
+        self._index = OrderedDict((name, size) for _, name, size in entries)
+        self._total_bytes = sum(self._index.values())
+
+    def _adopt_locked(self, name):
+        # Pick up a file another process (e.g. presynth.py) wrote since the scan
+        try:
+            size = os.stat(self.path(name)).st_size
+        except OSError:
+            return False
+        self._index[name] = size
+        self._total_bytes += size
+        self._evict_locked()
+        return True
+
+    def _forget_locked(self, name):
+        size = self._index.pop(name, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _evict_locked(self):
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            name, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self.path(name))
+            except OSError:
+                pass
+
+    def contains(self, name):
+        """Return True if a file exists, without changing its LRU position if it was indexed."""
+        with self._lock:
+            self._load_locked()
+            return name in self._index or self._adopt_locked(name)
+
+    def touch(self, name):
+        """Mark a file as just used; return False if it does not exist."""
+        with self._lock:
+            self._load_locked()
+            if name not in self._index:
+                return self._adopt_locked(name)
+            self._index.move_to_end(name)
+            return True
+
+    def read(self, name):
+        """Return a file's bytes and mark it as used, or None if it is missing."""
+        if not self.touch(name):
+            return None
+        path = self.path(name)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._forget_locked(name)
+            return None
+        return data
+
+    def put(self, name, data):
+        """Atomically write a file, then evict the least recently used ones over the cap."""
+        with self._lock:
+            self._load_locked()
+        atomic_write(self.path(name), data)
+        with self._lock:
+            self._forget_locked(name)
+            self._index[name] = len(data)
+            self._total_bytes += len(data)
+            self._evict_locked()
+
+    def stats(self):
+        """Return (file count, total bytes)."""
+        with self._lock:
+            self._load_locked()
+            return len(self._index), self._total_bytes
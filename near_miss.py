@@ -0,0 +1,194 @@
+"""
+Near-miss feedback for spelling answers.
+
+levenshtein() uses Myers' bit-parallel algorithm (Hyyrö's formulation), so
+one comparison costs a handful of integer ops per character. A
+symmetric-delete index over the lowercased word list finds the list words
+closest to what the student typed without scanning the list. align()
+reports which letters were wrong.
+"""
+import os
+import threading
+from array import array
+
+MAX_DISTANCE = int(os.environ.get("SPELLINGBEE_NEAR_MISS_DISTANCE", 2))
+
+
+def levenshtein(a, b):
+    """Edit distance between a and b via bit-parallel dynamic programming."""
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    m = len(b)
+    if m == 0:
+        return len(a)
+    peq = {}
+    for i, c in enumerate(b):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    full = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv, score = full, 0, m
+    for c in a:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & full
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = (mh | ~(xv | ph)) & full
+        mv = ph & xv
+    return score
+
+
+def align(typed, target):
+    """Return edit ops turning typed into target as (op, typed_chars, target_chars).
+
+    op is one of "equal", "replace", "insert" (letters missing from typed)
+    or "delete" (extra letters typed). Comparison is case-insensitive.
+    """
+    a, b = typed.lower(), target.lower()
+    n, m = len(a), len(b)
+    dist = [[0] * (m + 1) for _ in range(n + 1)]
+    for i in range(n + 1):
+        dist[i][0] = i
+    for j in range(m + 1):
+        dist[0][j] = j
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            dist[i][j] = min(dist[i - 1][j] + 1, dist[i][j - 1] + 1, dist[i - 1][j - 1] + cost)
+
+    ops = []
+    i, j = n, m
+    while i or j:
+        if i and j and dist[i][j] == dist[i - 1][j - 1] + (a[i - 1] != b[j - 1]):
+            op = "equal" if a[i - 1] == b[j - 1] else "replace"
+            ops.append((op, typed[i - 1], target[j - 1]))
+            i, j = i - 1, j - 1
+        elif j and dist[i][j] == dist[i][j - 1] + 1:
+            ops.append(("insert", "", target[j - 1]))
+            j -= 1
+        else:
+            ops.append(("delete", typed[i - 1], ""))
+            i -= 1
+    ops.reverse()
+
+    # Merge runs of the same op
+    merged = []
+    for op, x, y in ops:
+        if merged and merged[-1][0] == op:
+            merged[-1] = (op, merged[-1][1] + x, merged[-1][2] + y)
+        else:
+            merged.append((op, x, y))
+    return merged
+
+
+def _deletions(word, depth):
+    """Every string reachable from word by deleting up to depth characters."""
+    out, frontier = {word}, {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        out |= frontier
+    return out
+
+
+class DeletionIndex:
+    """Symmetric-delete index: two words within distance k share a k-deletion.
+
+    Hashes of every deletion variant are kept in one sorted int64 array with
+    a parallel array of word positions, so a lookup is a couple of binary
+    searches plus exact Myers checks on the few candidates.
+    """
+
+    def __init__(self, words, max_distance=2):
+        import numpy as np
+
+        self.words = list(words)
+        self.max_distance = max_distance
+        keys, owners = array("q"), array("q")
+        for pos, word in enumerate(self.words):
+            variants = _deletions(word, max_distance)
+            keys.extend(hash(v) for v in variants)
+            owners.extend([pos] * len(variants))
+        keys = np.frombuffer(keys, dtype=np.int64)
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.owners = np.frombuffer(owners, dtype=np.int64)[order]
+
+    def search(self, word, radius):
+        """Return [(distance, word)] within radius of word, nearest first."""
+        import numpy as np
+
+        radius = min(radius, self.max_distance)
+        if radius < 0 or not self.words:
+            return []
+        probe = np.fromiter((hash(v) for v in _deletions(word, radius)), dtype=np.int64)
+        lo = np.searchsorted(self.keys, probe, side="left")
+        hi = np.searchsorted(self.keys, probe, side="right")
+        found = []
+        seen = set()
+        for a, b in zip(lo.tolist(), hi.tolist()):
+            for pos in self.owners[a:b].tolist():
+                if pos in seen:
+                    continue
+                seen.add(pos)
+                candidate = self.words[pos]
+                d = levenshtein(word, candidate)
+                if d <= radius:
+                    found.append((d, candidate))
+        found.sort()
+        return found
+
+
+class NearMissIndex:
+    """Word-list index for answer feedback; the deletion index is built in the background."""
+
+    def __init__(self, words):
+        self.lower = {}
+        for word in words:
+            self.lower.setdefault(str(word).strip().lower(), str(word))
+        self.index = None
+        self._thread = threading.Thread(target=self._build, name="near-miss-index", daemon=True)
+        self._thread.start()
+
+    def _build(self):
+        self.index = DeletionIndex(self.lower, MAX_DISTANCE)
+
+    def list_word(self, typed):
+        """Return the list word spelled exactly like typed (case-insensitive), or None."""
+        return self.lower.get(typed.strip().lower())
+
+    def nearest(self, typed, radius=2, limit=3):
+        """Return up to limit (distance, list word) pairs within radius, or [] while building."""
+        index = self.index
+        if index is None:
+            return []
+        hits = index.search(typed.strip().lower(), radius)[:limit]
+        return [(d, self.lower[w]) for d, w in hits]
+
+
+def feedback(typed, target, index=None):
+    """Describe how close typed was to target."""
+    typed = typed.strip()
+    result = {
+        "distance": levenshtein(typed.lower(), target.strip().lower()),
+        "ops": align(typed, target.strip()),
+        "other_list_word": None,
+        "closer_list_words": [],
+    }
+    if index is not None and typed:
+        other = index.list_word(typed)
+        if other is not None and other.lower() != target.strip().lower():
+            result["other_list_word"] = other
+        elif result["distance"] > 1:
+            result["closer_list_words"] = [
+                w for d, w in index.nearest(typed, radius=result["distance"] - 1)
+                if w.lower() != target.strip().lower()
+            ]
+    return result
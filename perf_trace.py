@@ -0,0 +1,117 @@
+"""
+Lightweight per-rerun timing spans and counters.
+
+A trace is started at the top of each Streamlit rerun and finished at the
+end. While one is active on the current thread, span() records wall time
+for a named stage and count() bumps named counters (DB queries, TTS calls,
+cache hits). Finished traces are appended to a JSONL file. With no active
+trace, span() returns a shared no-op context and count() returns at once.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+TRACE_ENABLED = os.environ.get("SPELLINGBEE_TRACE", "") not in ("", "0")
+TRACE_FILE = os.environ.get("SPELLINGBEE_TRACE_FILE", "traces.jsonl")
+
+_local = threading.local()
+_file_lock = threading.Lock()
+_NULL_SPAN = nullcontext()
+_startup_ms = None  # first render time of this process
+
+
+class Trace:
+    def __init__(self, session_id, rerun):
+        self.session_id = session_id
+        self.rerun = rerun
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        self.total = None
+        self.spans = []  # (name, offset_s, duration_s)
+        self.counters = {}
+
+    def to_dict(self):
+        return {
+            "ts": round(self.wall_start, 3),
+            "session_id": self.session_id,
+            "rerun": self.rerun,
+            "total_ms": round(self.total * 1000, 3) if self.total is not None else None,
+            "spans": [
+                {"name": name, "offset_ms": round(offset * 1000, 3), "ms": round(duration * 1000, 3)}
+                for name, offset, duration in self.spans
+            ],
+            "counters": self.counters,
+        }
+
+
+class _Span:
+    __slots__ = ("trace", "name", "t0")
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.trace.spans.append((self.name, self.t0 - self.trace.start, end - self.t0))
+        return False
+
+
+def start_trace(session_id, rerun):
+    """Begin a trace for this thread's rerun, replacing any unfinished one."""
+    _local.trace = Trace(session_id, rerun)
+    return _local.trace
+
+
+def current():
+    return getattr(_local, "trace", None)
+
+
+def finish_trace(path=None):
+    """End this thread's trace, append it to the JSONL log and return it (or None)."""
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return None
+    _local.trace = None
+    trace.total = time.perf_counter() - trace.start
+    line = json.dumps(trace.to_dict(), separators=(",", ":"))
+    try:
+        with _file_lock:
+            with open(path or TRACE_FILE, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except OSError:
+        pass  # tracing must never break the app
+    return trace
+
+
+def span(name):
+    """Time a stage of the current rerun; a no-op when tracing is off."""
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return _NULL_SPAN
+    return _Span(trace, name)
+
+
+def count(name, n=1):
+    """Add n to a counter on the current rerun's trace, if any."""
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.counters[name] = trace.counters.get(name, 0) + n
+
+
+def record_startup(ms):
+    """Remember the first render time of this process; later calls are ignored."""
+    global _startup_ms
+    with _file_lock:
+        if _startup_ms is None:
+            _startup_ms = ms
+
+
+def startup_ms():
+    return _startup_ms
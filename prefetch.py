@@ -0,0 +1,88 @@
+"""
+Background audio prefetch for the upcoming words in the exam deck.
+
+While the student is typing, a small thread pool synthesizes audio for the
+next few queued words so that moving on never waits on TTS. Work is tagged
+per session; changing the tag (e.g. switching exam mode) cancels whatever
+that session had queued but not yet started.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import audio_cache
+import tts_backends
+
+PREFETCH_DEPTH = int(os.environ.get("SPELLINGBEE_PREFETCH_DEPTH", 3))
+PREFETCH_WORKERS = int(os.environ.get("SPELLINGBEE_PREFETCH_WORKERS", 2))
+PREFETCH_MAX_PENDING = int(os.environ.get("SPELLINGBEE_PREFETCH_MAX_PENDING", 32))
+
+_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="tts-prefetch")
+_lock = threading.RLock()
+_pending = {}  # (word, lang) -> Future
+_owners = {}  # session id -> (tag, set of (word, lang) keys it submitted)
+
+
+def _done(key, future):
+    with _lock:
+        if _pending.get(key) is future:
+            _pending.pop(key, None)
+
+
+def _cancel_owner_locked(session_id):
+    _, keys = _owners.pop(session_id, (None, set()))
+    for key in keys:
+        future = _pending.get(key)
+        # Only not-yet-started work can be cancelled; running jobs finish into the cache
+        if future is not None and future.cancel():
+            _pending.pop(key, None)
+
+
+def prefetch(session_id, tag, words, lang="en"):
+    """Queue audio synthesis for words, dropping this session's stale work if tag changed."""
+    with _lock:
+        owner = _owners.get(session_id)
+        if owner is not None and owner[0] != tag:
+            _cancel_owner_locked(session_id)
+            owner = None
+        if owner is None:
+            owner = _owners[session_id] = (tag, set())
+        owner[1].intersection_update(_pending)
+        for word in words[:PREFETCH_DEPTH]:
+            word = str(word)
+            key = (word, lang)
+            if key in _pending or audio_cache.is_cached(word, lang):
+                continue
+            if len(_pending) >= PREFETCH_MAX_PENDING:
+                break
+            future = _executor.submit(audio_cache.get_audio, word, lang)
+            _pending[key] = future
+            future.add_done_callback(lambda f, key=key: _done(key, f))
+            owner[1].add(key)
+
+
+def cancel(session_id):
+    """Cancel all queued prefetch work for a session."""
+    with _lock:
+        _cancel_owner_locked(session_id)
+
+
+def get_audio(word, lang="en"):
+    """Return audio for a word, joining an in-flight prefetch instead of re-synthesizing.
+
+    Queued-but-unstarted prefetch work is cancelled and done inline, and a
+    running job is waited on for at most TTS_TIMEOUT, so the render path
+    never waits behind other sessions' prefetch queue.
+    """
+    key = (word, lang)
+    with _lock:
+        future = _pending.get(key)
+        if future is not None and future.cancel():
+            _pending.pop(key, None)
+            future = None
+    if future is not None and not future.cancelled():
+        try:
+            return future.result(timeout=tts_backends.TTS_TIMEOUT)
+        except Exception:
+            pass
+    return audio_cache.get_audio(word, lang)
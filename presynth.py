@@ -0,0 +1,178 @@
+"""
+Pre-synthesize audio for every word in the word list, ahead of exam day.
+
+Reads the same sources as the app (SPELLINGBEE_DATA_SOURCES or
+SPELLINGBEE_DATA_FILE) and fills the on-disk audio cache with a bounded
+worker pool. Words that already have cached audio are skipped, so an
+interrupted run picks up where it stopped. A JSON manifest records each
+word's status, engine, size and synthesis time, plus any failures.
+
+Run the app with SPELLINGBEE_AUDIO_PREBUILT_ONLY=1 to serve only this store.
+
+Usage: python presynth.py [--workers N] [--force] [--manifest FILE]   (see --help)
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import audio_cache
+import lru_dir
+import tts_backends
+import word_store
+
+CHECKPOINT_SECONDS = 5.0
+
+
+def cached_engine(word, lang, engines):
+    """Return the first engine in the chain with audio cached for word, or None."""
+    for engine in engines:
+        if audio_cache.contains(audio_cache.cache_key(word, lang, engine)):
+            return engine
+    return None
+
+
+def synthesize_one(word, lang, engines, retries):
+    """Synthesize and cache one word; return its manifest entry."""
+    t0 = time.perf_counter()
+    error = None
+    for _ in range(retries + 1):
+        try:
+            data, engine = tts_backends.synthesize(word, lang, engines)
+            audio_cache.put(audio_cache.cache_key(word, lang, engine), data)
+            return {"status": "ok", "engine": engine, "bytes": len(data),
+                    "ms": round((time.perf_counter() - t0) * 1000, 1)}
+        except (tts_backends.TTSError, OSError) as e:
+            error = str(e)
+    return {"status": "failed", "error": error, "ms": round((time.perf_counter() - t0) * 1000, 1)}
+
+
+def write_manifest(path, manifest):
+    """Atomically replace the manifest file."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    lru_dir.atomic_write(path, json.dumps(manifest, indent=1).encode("utf-8"))
+
+
+def presynth(sources, lang="en", engines=None, workers=4, force=False, retries=1, manifest_path=None):
+    """Fill the audio cache for every word in sources; return the manifest dict."""
+    engines = tts_backends.engine_chain(engines)
+    if not engines:
+        raise tts_backends.TTSError("No TTS engines available")
+    manifest_path = manifest_path or os.path.join(audio_cache.AUDIO_CACHE_DIR, "manifest.json")
+    words = list(dict.fromkeys(str(w).strip() for w in word_store.load_word_lists(sources)[0]))
+    manifest = {
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "finished": None,
+        "sources": word_store.expand_sources(sources),
+        "lang": lang,
+        "engines": engines,
+        "summary": {},
+        "words": {},
+    }
+
+    # Keep timings from an earlier run for words that are still cached
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            previous = json.load(f).get("words", {})
+    except (OSError, ValueError):
+        previous = {}
+
+    todo = []
+    for word in words:
+        engine = None if force else cached_engine(word, lang, engines)
+        if engine is not None:
+            entry = previous.get(word, {})
+            manifest["words"][word] = {"status": "up_to_date", "engine": engine,
+                                       **{k: entry[k] for k in ("bytes", "ms") if k in entry}}
+        else:
+            todo.append(word)
+    print(f"{len(words)} words, {len(words) - len(todo)} already up to date, {len(todo)} to synthesize "
+          f"with {', '.join(engines)} ({workers} workers)")
+
+    evictions_before = audio_cache.cache_stats()["evictions"]
+    t0 = last_checkpoint = time.perf_counter()
+    done = 0
+    pending = {}
+    queue = iter(todo)
+    interrupted = False
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="presynth")
+    try:
+        # Keep at most 2 * workers words in flight so memory stays flat on huge lists
+        while True:
+            while len(pending) < 2 * workers:
+                word = next(queue, None)
+                if word is None:
+                    break
+                pending[executor.submit(synthesize_one, word, lang, engines, retries)] = word
+            if not pending:
+                break
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                word = pending.pop(future)
+                entry = future.result()
+                manifest["words"][word] = entry
+                done += 1
+                if entry["status"] == "failed":
+                    print(f"  failed: {word}: {entry['error']}")
+            now = time.perf_counter()
+            if now - last_checkpoint >= CHECKPOINT_SECONDS:
+                rate = done / (now - t0)
+                print(f"  [{done}/{len(todo)}] {rate:.1f} words/s")
+                write_manifest(manifest_path, manifest)
+                last_checkpoint = now
+    except KeyboardInterrupt:
+        interrupted = True
+        print("\nInterrupted; finished words are cached, re-run to resume.")
+    finally:
+        executor.shutdown(wait=not interrupted, cancel_futures=True)
+
+    statuses = [entry["status"] for entry in manifest["words"].values()]
+    manifest["summary"] = {
+        "words": len(words),
+        "ok": statuses.count("ok"),
+        "up_to_date": statuses.count("up_to_date"),
+        "failed": statuses.count("failed"),
+        "missing": len(words) - len(statuses),
+        "seconds": round(time.perf_counter() - t0, 2),
+    }
+    manifest["finished"] = None if interrupted else time.strftime("%Y-%m-%dT%H:%M:%S")
+    write_manifest(manifest_path, manifest)
+
+    evicted = audio_cache.cache_stats()["evictions"] - evictions_before
+    if evicted:
+        print(f"Warning: {evicted} cache entries were evicted; raise SPELLINGBEE_AUDIO_CACHE_MAX_BYTES "
+              f"(now {audio_cache.AUDIO_CACHE_MAX_BYTES}) so the whole list fits.")
+    return manifest
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Synthesize audio for every word in the word list into the audio cache.",
+        epilog="""examples:
+  python presynth.py                              # fill the cache, skipping cached words
+  python presynth.py --workers 8 --engines espeak # offline engine only
+  python presynth.py --force                      # re-synthesize everything""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("sources", nargs="*", help="word-list files or directories (default: the app's sources)")
+    parser.add_argument("--lang", default="en")
+    parser.add_argument("--engines", help="comma-separated engine chain (default: SPELLINGBEE_TTS_ENGINES)")
+    parser.add_argument("--workers", type=int, default=4, help="parallel synthesis jobs (default: 4; network engines are also capped by SPELLINGBEE_TTS_THREADS)")
+    parser.add_argument("--retries", type=int, default=1, help="extra attempts per failed word (default: 1)")
+    parser.add_argument("--force", action="store_true", help="re-synthesize words that are already cached")
+    parser.add_argument("--manifest", help="manifest file (default: <audio cache>/manifest.json)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()] if args.engines else None
+    try:
+        result = presynth(args.sources or word_store.data_sources(), args.lang, engines,
+                          max(1, args.workers), args.force, max(0, args.retries), args.manifest)
+    except tts_backends.TTSError as e:
+        sys.exit(f"Error: {e}")
+    print(json.dumps(result["summary"]))
+    sys.exit(1 if result["summary"]["failed"] or result["finished"] is None else 0)
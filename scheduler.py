@@ -0,0 +1,123 @@
+"""
+Leitner-style spaced-repetition deck.
+
+Each word sits in a box; a correct first try moves it up a box and a miss
+sends it back to box 1. The box sets how long until the word is due again.
+Per-word (box, due) is persisted in the review_schedule table. A session
+holds its deck as a heap of (due, tiebreak, word_id) for words it has seen
+plus a shuffled deque of unseen ones, so picking or requeueing the next
+word is O(log n) and grading touches a single row. Due reviews come before new words.
+"""
+import heapq
+import random
+import time
+from collections import deque
+from itertools import islice
+
+# Seconds until a word is due again, indexed by box. Box 0 = never seen.
+LEITNER_INTERVALS = [0, 10 * 60, 86400, 3 * 86400, 7 * 86400, 14 * 86400, 30 * 86400]
+MAX_BOX = len(LEITNER_INTERVALS) - 1
+
+
+def next_box(box, is_correct):
+    # A miss always restarts at box 1; a new word answered right skips straight to box 2
+    return min(max(box, 1) + 1, MAX_BOX) if is_correct else 1
+
+
+class ReviewDeck:
+    """Word ids to study: seen words in a heap by due time, unseen words in a shuffled pile.
+
+    pop() serves a review that is already due before any new word, then new
+    words, and only then reviews that are not due yet (earliest first).
+    """
+
+    def __init__(self, ids, schedule=None, rng=None):
+        schedule = schedule or {}
+        self._rng = rng or random.Random()
+        self.schedule = {}  # word_id -> (box, due)
+        self.reviews = []  # heap of (due, tiebreak, word_id) for words seen before
+        new = []
+        for i in ids:
+            entry = schedule.get(i, (0, 0))
+            self.schedule[i] = entry
+            if entry[0] == 0:
+                new.append(i)
+            else:
+                self.reviews.append((entry[1], self._rng.random(), i))
+        heapq.heapify(self.reviews)
+        self._rng.shuffle(new)
+        self.new = deque(new)  # unseen word ids, served from the right end
+
+    def __len__(self):
+        return len(self.reviews) + len(self.new)
+
+    def pop(self, now=None):
+        """Remove and return the id of the next word to study, or None if empty."""
+        now = time.time() if now is None else now
+        if self.reviews and (self.reviews[0][0] <= now or not self.new):
+            return heapq.heappop(self.reviews)[2]
+        if self.new:
+            return self.new.pop()
+        return None
+
+    def peek(self, k, now=None):
+        """Return the next k ids pop() would serve, without removing them."""
+        now = time.time() if now is None else now
+        soonest = heapq.nsmallest(k, self.reviews)
+        due = [entry[2] for entry in soonest if entry[0] <= now]
+        later = [entry[2] for entry in soonest if entry[0] > now]
+        return (due + list(islice(reversed(self.new), k)) + later)[:k]
+
+    def due_count(self, now=None):
+        """Count reviews due by now, visiting only the due part of the heap."""
+        now = time.time() if now is None else now
+        count, stack = 0, [0] if self.reviews else []
+        while stack:
+            pos = stack.pop()
+            if self.reviews[pos][0] > now:
+                continue
+            count += 1
+            stack.extend(c for c in (2 * pos + 1, 2 * pos + 2) if c < len(self.reviews))
+        return count
+
+    def grade(self, word_id, is_correct, now=None):
+        """Move a word to its next box and return the new (box, due) to persist."""
+        now = int(time.time() if now is None else now)
+        box, _ = self.schedule.get(word_id, (0, 0))
+        box = next_box(box, is_correct)
+        entry = (box, now + LEITNER_INTERVALS[box])
+        self.schedule[word_id] = entry
+        return entry
+
+    def remap(self, mapping, members=None, schedule=None):
+        """Translate ids after the word list changed; removed words drop out.
+
+        mapping is old id -> new id (see word_store.id_map). If members is
+        given, the deck is trimmed to exactly those ids: words outside it are
+        dropped, and members not yet in the deck join with their (box, due)
+        from schedule, or unseen.
+        """
+        self.schedule = {mapping[i]: entry for i, entry in self.schedule.items() if i in mapping}
+        self.reviews = [(due, tie, mapping[i]) for due, tie, i in self.reviews if i in mapping]
+        self.new = deque(mapping[i] for i in self.new if i in mapping)
+        if members is not None:
+            members = set(members)
+            schedule = schedule or {}
+            self.schedule = {i: entry for i, entry in self.schedule.items() if i in members}
+            self.reviews = [entry for entry in self.reviews if entry[2] in members]
+            self.new = deque(i for i in self.new if i in members)
+            for i in sorted(members.difference(self.schedule)):
+                box, due = self.schedule[i] = schedule.get(i, (0, 0))
+                if box == 0:
+                    self.new.insert(self._rng.randint(0, len(self.new)), i)
+                else:
+                    self.reviews.append((due, self._rng.random(), i))
+        heapq.heapify(self.reviews)
+
+    def requeue(self, word_id):
+        """Put a popped word back: a still-unseen word goes to the bottom of the new pile."""
+        box, due = self.schedule.get(word_id, (0, 0))
+        if box == 0:
+            self.new.appendleft(word_id)
+        else:
+            heapq.heappush(self.reviews, (due, self._rng.random(), word_id))
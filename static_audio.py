@@ -0,0 +1,73 @@
+"""
+Publish word audio as static files the browser can cache.
+
+Streamlit serves ./static/ at app/static/ when server.enableStaticServing is
+on. Audio is written there once under its content hash, and the page only
+references the URL, so a rerun sends no audio bytes and the browser reuses
+its cached copy. The ?v=<hash> query marks the URL as versioned, so servers
+that honour it can send far-future cache headers. The name changes whenever
+the bytes do, so a cached copy is never stale.
+
+The directory only holds the recently played subset of audio_cache: it is
+capped at STATIC_AUDIO_MAX_BYTES and evicts least-recently-used files, and
+an evicted word is simply re-published from the audio cache on next use.
+"""
+import hashlib
+import os
+import threading
+
+import audio_cache
+import lru_dir
+import tts_backends
+
+STATIC_AUDIO_DIR = os.environ.get(
+    "SPELLINGBEE_STATIC_AUDIO_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "audio")
+)
+STATIC_AUDIO_MAX_BYTES = int(os.environ.get("SPELLINGBEE_STATIC_AUDIO_MAX_BYTES", 50 * 1024 * 1024))
+STATIC_AUDIO_URL = "app/static/audio"
+
+_store = lru_dir.LRUDirectory(STATIC_AUDIO_DIR, [".wav", ".mp3"], STATIC_AUDIO_MAX_BYTES)
+_lock = threading.Lock()
+_published = {}  # (word, lang) -> file name under STATIC_AUDIO_DIR
+
+
+def _file_name(data):
+    digest = hashlib.sha256(data).hexdigest()[:32]
+    ext = ".wav" if tts_backends.audio_format(data) == "audio/wav" else ".mp3"
+    return digest + ext
+
+
+def _url(name):
+    digest = name.rsplit(".", 1)[0]
+    return f"{STATIC_AUDIO_URL}/{name}?v={digest}"
+
+
+def _write(data):
+    """Write audio bytes under their content hash (once) and return the file name."""
+    name = _file_name(data)
+    if not (_store.touch(name) and os.path.exists(_store.path(name))):
+        _store.put(name, data)
+    return name
+
+
+def audio_url(word, lang="en", fetch=None):
+    """Return a static URL for a word's audio, synthesizing it on first use.
+
+    fetch(word, lang) supplies the bytes on a miss (defaults to
+    audio_cache.get_audio). Raises tts_backends.TTSError if no audio can be made.
+    """
+    key = (str(word), lang)
+    with _lock:
+        name = _published.get(key)
+    if name is not None and _store.touch(name) and os.path.exists(_store.path(name)):
+        return _url(name)
+    name = _write((fetch or audio_cache.get_audio)(str(word), lang))
+    with _lock:
+        _published[key] = name
+    return _url(name)
+
+
+def audio_tag(url, autoplay=False):
+    """HTML audio player for a static URL."""
+    autoplay = " autoplay" if autoplay else ""
+    return f'<audio controls preload="auto"{autoplay} src="{url}" style="width: 100%;"></audio>'
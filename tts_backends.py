@@ -0,0 +1,138 @@
+"""
+Pluggable text-to-speech backends.
+
+Each backend turns a word into audio bytes. Calls go through synthesize(),
+which enforces a per-call timeout and falls back along the configured
+engine chain, so a slow or offline network never stalls the exam render.
+Network engines run on their own thread pool; local engines bound their
+own run time and are called directly, so hung network calls filling that
+pool can never block the offline fallback.
+"""
+import hashlib
+import importlib.util
+import io
+import os
+import shutil
+import subprocess
+import wave
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import perf_trace
+
+TTS_ENGINES = [e.strip() for e in os.environ.get("SPELLINGBEE_TTS_ENGINES", "gtts,espeak").split(",") if e.strip()]
+TTS_TIMEOUT = float(os.environ.get("SPELLINGBEE_TTS_TIMEOUT", 5.0))
+TTS_THREADS = int(os.environ.get("SPELLINGBEE_TTS_THREADS", 4))
+
+# Network backend calls run here so a hung request can be abandoned after TTS_TIMEOUT
+_executor = ThreadPoolExecutor(max_workers=TTS_THREADS, thread_name_prefix="tts")
+
+
+class TTSError(Exception):
+    """Raised when no configured engine could synthesize a word."""
+
+
+class TTSBackend:
+    """Base class: subclasses set `name` and implement synthesize()."""
+    name = ""
+    network = False  # True: may hang on I/O, so synthesize() runs it under a timeout
+
+    def available(self):
+        return True
+
+    def synthesize(self, word, lang="en"):
+        raise NotImplementedError
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS. Needs the network; returns MP3."""
+    name = "gtts"
+    network = True
+
+    def available(self):
+        # find_spec checks for the package without paying for its import
+        return importlib.util.find_spec("gtts") is not None
+
+    def synthesize(self, word, lang="en"):
+        from gtts import gTTS
+        audio_io = io.BytesIO()
+        gTTS(text=str(word), lang=lang, timeout=TTS_TIMEOUT).write_to_fp(audio_io)
+        return audio_io.getvalue()
+
+
+class EspeakBackend(TTSBackend):
+    """Local offline synthesis via espeak-ng/espeak; returns WAV."""
+    name = "espeak"
+
+    def __init__(self):
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def available(self):
+        return self.binary is not None
+
+    def synthesize(self, word, lang="en"):
+        result = subprocess.run(
+            [self.binary, "-v", lang, "--stdout", str(word)],
+            capture_output=True, timeout=TTS_TIMEOUT, check=True,
+        )
+        return result.stdout
+
+
+class StubBackend(TTSBackend):
+    """Deterministic silent WAV whose length depends on the word. For tests and benchmarks."""
+    name = "stub"
+
+    def synthesize(self, word, lang="en"):
+        digest = hashlib.sha256(f"{lang}:{word}".encode("utf-8")).digest()
+        frames = 800 + digest[0] * 8
+        out = io.BytesIO()
+        with wave.open(out, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(1)
+            w.setframerate(8000)
+            w.writeframes(b"\x80" * frames)
+        return out.getvalue()
+
+
+BACKENDS = {cls.name: cls for cls in (GTTSBackend, EspeakBackend, StubBackend)}
+_instances = {}
+
+
+def get_backend(name):
+    """Return a shared backend instance by name."""
+    if name not in _instances:
+        if name not in BACKENDS:
+            raise TTSError(f"Unknown TTS engine: {name}")
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
+
+
+def engine_chain(engines=None):
+    """Return the names of configured engines that are usable here, in fallback order."""
+    return [name for name in (engines or TTS_ENGINES) if get_backend(name).available()]
+
+
+def synthesize(word, lang="en", engines=None, timeout=TTS_TIMEOUT):
+    """Synthesize a word with the first engine that succeeds within timeout.
+
+    Returns (audio_bytes, engine_name). Raises TTSError if every engine fails.
+    """
+    errors = []
+    for name in engine_chain(engines):
+        perf_trace.count("tts_calls")
+        backend = get_backend(name)
+        try:
+            if not backend.network:
+                return backend.synthesize(word, lang), name
+            future = _executor.submit(backend.synthesize, word, lang)
+            return future.result(timeout=timeout), name
+        except FutureTimeout:
+            future.cancel()
+            errors.append(f"{name}: timed out after {timeout}s")
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+    raise TTSError(f"Could not synthesize {word!r} ({'; '.join(errors) or 'no engines available'})")
+
+
+def audio_format(data):
+    """Return the MIME type for audio bytes produced by any backend."""
+    return "audio/wav" if data[:4] == b"RIFF" else "audio/mp3"
@@ -1,86 +1,240 @@
 """
 Simple script to view and interact with the SQLite database.
-Usage: python view_db.py
+Usage: python view_db.py [command] [options]   (see --help)
 """
+import argparse
+import csv
+import json
 import sqlite3
 import sys
 from datetime import datetime
 
-DB_PATH = "scores.db"
+import db
 
-def view_all_scores():
-    """Display all scores in the database."""
+DB_PATH = db.DB_PATH
+FETCH_SIZE = 1000
+EXPORT_FORMATS = ["csv", "jsonl", "parquet"]
+
+def get_connection():
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
+    return conn
+
+def user_clause(conn, user):
+    """SQL condition and params for one student's rows.
+
+    A database from before the multi-student migration has no user_id
+    column; all of its rows belong to db.DEFAULT_USER.
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(scores)")]
+    if "user_id" in columns:
+        return "user_id = ?", [user]
+    return ("1", []) if user == db.DEFAULT_USER else ("0", [])
+
+def iter_rows(cursor, size=FETCH_SIZE):
+    """Yield rows from an executed cursor in fetchmany() batches, so memory stays bounded."""
+    while True:
+        batch = cursor.fetchmany(size)
+        if not batch:
+            return
+        yield from batch
+
+def view_all_scores(limit=None, offset=0, after_id=None, user=None):
+    """Display scores, newest first, streaming rows as they are read.
+
+    after_id pages by primary key (WHERE id < after_id), which stays fast on
+    any page; limit/offset page by position. Paged listings are all ordered
+    by id, so a full page's --after-id hint continues any of them.
+    """
+    conn = get_connection()
     cursor = conn.cursor()
-    
-    cursor.execute("SELECT * FROM scores ORDER BY date DESC, id DESC")
-    rows = cursor.fetchall()
-    
-    if not rows:
+
+    where, params = [], []
+    if user is not None:
+        clause, user_params = user_clause(conn, user)
+        where.append(clause)
+        params.extend(user_params)
+    if after_id is not None:
+        where.append("id < ?")
+        params.append(after_id)
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+    paged = limit is not None or offset or after_id is not None
+    order_sql = "ORDER BY id DESC" if paged else "ORDER BY date DESC, id DESC"
+
+    total = cursor.execute(f"SELECT COUNT(*) FROM scores {where_sql}", params).fetchone()[0]
+    if not total:
         print("No scores found in the database.")
+        conn.close()
         return
-    
-    print(f"\nTotal records: {len(rows)}\n")
+
+    page_sql = ""
+    if limit is not None or offset:
+        page_sql = "LIMIT ? OFFSET ?"
+        params = params + [limit if limit is not None else -1, offset]
+    cursor.execute(f"SELECT * FROM scores {where_sql} {order_sql} {page_sql}", params)
+
+    print(f"\nTotal records: {total}\n")
     print(f"{'ID':<5} {'Date':<12} {'Word':<25} {'Correct':<10} {'Attempts':<10}")
     print("-" * 70)
-    
-    for row in rows:
+
+    shown = 0
+    last_id = None
+    for row in iter_rows(cursor):
         correct_str = "Yes" if row['correctly_spelled'] else "No"
         print(f"{row['id']:<5} {row['date']:<12} {row['word']:<25} {correct_str:<10} {row['attempts']:<10}")
-    
+        shown += 1
+        last_id = row['id']
+
+    if limit is not None and shown == limit:
+        print(f"\nNext page: --after-id {last_id} --limit {limit}")
+
     conn.close()
 
-def view_stats():
-    """Display summary statistics."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    # Total records
-    cursor.execute("SELECT COUNT(*) as count FROM scores")
-    total = cursor.fetchone()['count']
-    
-    # Correct vs incorrect
-    cursor.execute("SELECT SUM(correctly_spelled) as correct, COUNT(*) as total FROM scores")
-    result = cursor.fetchone()
-    correct_count = result['correct']
-    total_count = result['total']
-    accuracy = (correct_count / total_count * 100) if total_count > 0 else 0
-    
-    # Date range
-    cursor.execute("SELECT MIN(date) as min_date, MAX(date) as max_date FROM scores")
-    date_range = cursor.fetchone()
-    
-    print("\n=== Database Statistics ===")
-    print(f"Total records: {total}")
-    print(f"Correct answers: {correct_count}")
-    print(f"Incorrect answers: {total_count - correct_count}")
-    print(f"Accuracy: {accuracy:.1f}%")
-    if date_range['min_date']:
-        print(f"Date range: {date_range['min_date']} to {date_range['max_date']}")
-    
+def ensure_stats_index(conn):
+    """Covering index so date-ranged stats are one ordered index range scan."""
+    try:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_scores_date_word ON scores (date, word, correctly_spelled)")
+        conn.commit()
+    except sqlite3.OperationalError:
+        pass  # read-only database: fall back to a table scan
+
+def period_of(day, period):
+    if period == "week":
+        year, week, _ = datetime.strptime(day, "%Y-%m-%d").isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == "day":
+        return day
+    return day[:7]
+
+def compute_stats(rows, period="month", top=3):
+    """Aggregate (date, word, attempts, correct) rows, ordered by date, in a single pass."""
+    total = correct = 0
+    days = {}  # date -> [attempts, correct]
+    period_misses = {}  # period -> {word: mistakes}
+    for day, word, n, n_correct in rows:
+        total += n
+        correct += n_correct
+        counts = days.setdefault(day, [0, 0])
+        counts[0] += n
+        counts[1] += n_correct
+        if n > n_correct:
+            misses = period_misses.setdefault(period_of(day, period), {})
+            misses[word] = misses.get(word, 0) + n - n_correct
+
+    # Streaks of consecutive practice days
+    longest = current = 0
+    prev = None
+    for day in days:
+        d = datetime.strptime(day, "%Y-%m-%d").date()
+        current = current + 1 if prev is not None and (d - prev).days == 1 else 1
+        longest = max(longest, current)
+        prev = d
+
+    hardest = {
+        p: sorted(misses.items(), key=lambda kv: (-kv[1], kv[0]))[:top]
+        for p, misses in period_misses.items()
+    }
+    return {
+        "total": total,
+        "correct": correct,
+        "accuracy": (correct / total * 100) if total else 0,
+        "first_date": next(iter(days), None),
+        "last_date": prev.isoformat() if prev else None,
+        "days": days,
+        "longest_streak": longest,
+        "current_streak": current,
+        "hardest": hardest,
+    }
+
+def view_stats(date_from=None, date_to=None, user=None, period="month", top=3, histogram=True):
+    """Display summary statistics, daily activity, streaks and hardest words from one scan."""
+    conn = get_connection()
+    ensure_stats_index(conn)
+
+    where, params = [], []
+    if date_from:
+        where.append("date >= ?")
+        params.append(date_from)
+    if date_to:
+        where.append("date <= ?")
+        params.append(date_to)
+    if user is not None:
+        clause, user_params = user_clause(conn, user)
+        where.append(clause)
+        params.extend(user_params)
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+
+    query = f"""
+        SELECT date, word, COUNT(*), SUM(correctly_spelled != 0)
+        FROM scores {where_sql}
+        GROUP BY date, word
+    """
+    has_daily = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'scores_daily'"
+    ).fetchone()
+    if has_daily:
+        # Fold in history that `compact` moved out of scores
+        query += f"""
+            UNION ALL
+            SELECT date, word, SUM(attempts), SUM(correct_count)
+            FROM scores_daily {where_sql}
+            GROUP BY date, word
+        """
+        params = params * 2
+    cursor = conn.execute(query + " ORDER BY date, word", params)
+    stats = compute_stats(iter_rows(cursor), period, top)
     conn.close()
 
-def run_query(query):
-    """Run a custom SQL query."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    print("\n=== Database Statistics ===")
+    print(f"Total records: {stats['total']}")
+    print(f"Correct answers: {stats['correct']}")
+    print(f"Incorrect answers: {stats['total'] - stats['correct']}")
+    print(f"Accuracy: {stats['accuracy']:.1f}%")
+    if stats['first_date']:
+        print(f"Date range: {stats['first_date']} to {stats['last_date']}")
+    else:
+        return
+
+    print(f"Practice days: {len(stats['days'])}")
+    print(f"Longest streak: {stats['longest_streak']} day(s)")
+    print(f"Streak ending {stats['last_date']}: {stats['current_streak']} day(s)")
+
+    if histogram:
+        print("\n=== Daily Activity ===")
+        peak = max(n for n, _ in stats['days'].values())
+        for day, (n, n_correct) in stats['days'].items():
+            bar = "#" * max(1, round(n / peak * 40))
+            print(f"{day}  {n:>6} {n_correct / n * 100:>5.0f}%  {bar}")
+
+    if stats['hardest']:
+        print(f"\n=== Hardest Words by {period.capitalize()} ===")
+        for p, words in stats['hardest'].items():
+            print(f"{p}: " + ", ".join(f"{w} ({m})" for w, m in words))
+
+def run_query(query, limit=None):
+    """Run a custom SQL query, streaming the results."""
+    conn = get_connection()
     cursor = conn.cursor()
     
     try:
         cursor.execute(query)
-        rows = cursor.fetchall()
-        
-        if rows:
-            # Print column names
-            print("\n" + " | ".join(rows[0].keys()))
-            print("-" * 70)
-            
-            # Print rows
-            for row in rows:
-                print(" | ".join(str(val) for val in row))
-        else:
+        if cursor.description is None:
+            print("No results found.")
+            return
+
+        shown = 0
+        for row in iter_rows(cursor):
+            if shown == 0:
+                # Print column names
+                print("\n" + " | ".join(col[0] for col in cursor.description))
+                print("-" * 70)
+            if limit is not None and shown >= limit:
+                print(f"... (stopped after {limit} rows)")
+                break
+            print(" | ".join(str(val) for val in row))
+            shown += 1
+
+        if shown == 0:
             print("No results found.")
             
     except sqlite3.Error as e:
@@ -88,6 +242,69 @@ def run_query(query):
     finally:
         conn.close()
 
+def export_scores(fmt, output=None, user=None, batch_size=FETCH_SIZE):
+    """Export the scores table in id order, one batch at a time, in constant memory."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    if user is not None:
+        clause, params = user_clause(conn, user)
+        cursor.execute(f"SELECT * FROM scores WHERE {clause} ORDER BY id", params)
+    else:
+        cursor.execute("SELECT * FROM scores ORDER BY id")
+    columns = [col[0] for col in cursor.description]
+    written = 0
+
+    try:
+        if fmt == "parquet":
+            written = _export_parquet(cursor, columns, output, batch_size)
+        else:
+            out = open(output, "w", newline="", encoding="utf-8") if output else sys.stdout
+            try:
+                if fmt == "csv":
+                    writer = csv.writer(out)
+                    writer.writerow(columns)
+                    for row in iter_rows(cursor, batch_size):
+                        writer.writerow(tuple(row))
+                        written += 1
+                else:
+                    for row in iter_rows(cursor, batch_size):
+                        out.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n")
+                        written += 1
+            finally:
+                if output:
+                    out.close()
+    finally:
+        conn.close()
+
+    if output:
+        print(f"Exported {written} rows to {output}")
+
+def _export_parquet(cursor, columns, output, batch_size):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        sys.exit("Parquet export needs pyarrow: pip install pyarrow")
+    if not output:
+        sys.exit("Parquet export needs an output file: --output scores.parquet")
+
+    written = 0
+    writer = None
+    try:
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            table = pa.Table.from_pylist([dict(zip(columns, row)) for row in batch])
+            if writer is None:
+                writer = pq.ParquetWriter(output, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            written += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
 def interactive_mode():
     """Interactive mode to run queries."""
     print("\n=== Interactive SQLite Query Mode ===")
@@ -118,24 +335,82 @@ def interactive_mode():
         except Exception as e:
             print(f"Error: {e}")
 
+def compact(keep_days, archive_path, user_id=None):
+    """Fold old raw attempts into daily rollups and move them to an archive DB."""
+    db.DB_PATH = DB_PATH
+    db.init_db()
+    result = db.compact_history(keep_days, archive_path, user_id=user_id)
+    print(f"Compacted {result['rows_compacted']} attempts before {result['cutoff']} "
+          f"({result['rows_archived']} archived to {result['archive_path']})")
+    print(f"Database size: {result['bytes_before'] / 1024:.0f} KB -> {result['bytes_after'] / 1024:.0f} KB")
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="View and interact with the spelling bee scores database.",
+        epilog="""examples:
+  python view_db.py                                  # View all scores and statistics
+  python view_db.py list --limit 50 --offset 100     # Page through scores by position
+  python view_db.py list --limit 50 --after-id 1234  # Page by id (fast on any page)
+  python view_db.py stats                            # View statistics
+  python view_db.py stats --from 2026-01-01 --to 2026-03-31 --period week
+  python view_db.py query 'SQL'                      # Run a query
+  python view_db.py export --format csv -o out.csv   # Export scores in constant memory
+  python view_db.py compact --keep-days 90           # Archive old attempts, keep rollups
+  python view_db.py interactive                      # Interactive mode""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    sub = parser.add_subparsers(dest="command")
+
+    list_p = sub.add_parser("list", help="List scores, newest first")
+    list_p.add_argument("--limit", type=int)
+    list_p.add_argument("--offset", type=int, default=0)
+    list_p.add_argument("--after-id", type=int, help="show rows with id below this (keyset paging)")
+    list_p.add_argument("--user", help="only this student's rows")
+
+    stats_p = sub.add_parser("stats", help="View statistics")
+    stats_p.add_argument("--from", dest="date_from", metavar="YYYY-MM-DD")
+    stats_p.add_argument("--to", dest="date_to", metavar="YYYY-MM-DD")
+    stats_p.add_argument("--user", help="only this student's rows")
+    stats_p.add_argument("--period", choices=["day", "week", "month"], default="month",
+                         help="grouping for hardest words")
+    stats_p.add_argument("--top", type=int, default=3, help="hardest words to show per period")
+    stats_p.add_argument("--no-histogram", action="store_true")
+
+    query_p = sub.add_parser("query", help="Run a SQL query")
+    query_p.add_argument("sql", nargs="+")
+    query_p.add_argument("--limit", type=int, help="stop printing after this many rows")
+
+    export_p = sub.add_parser("export", help="Export scores as CSV, JSONL or Parquet")
+    export_p.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    export_p.add_argument("-o", "--output", help="output file (default: stdout; required for parquet)")
+    export_p.add_argument("--user", help="only this student's rows")
+    export_p.add_argument("--batch-size", type=int, default=FETCH_SIZE)
+
+    compact_p = sub.add_parser("compact", help="Roll up and archive old raw attempts")
+    compact_p.add_argument("--keep-days", type=int, default=db.COMPACT_KEEP_DAYS,
+                           help=f"raw attempts to keep (default: {db.COMPACT_KEEP_DAYS})")
+    compact_p.add_argument("--archive", default=db.ARCHIVE_PATH, help=f"archive database file (default: {db.ARCHIVE_PATH})")
+    compact_p.add_argument("--user", help="only this student's rows (default: every student, then VACUUM)")
+
+    sub.add_parser("interactive", help="Interactive mode")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        command = sys.argv[1]
-        
-        if command == "stats":
-            view_stats()
-        elif command == "query" and len(sys.argv) > 2:
-            run_query(" ".join(sys.argv[2:]))
-        elif command == "interactive":
-            interactive_mode()
-        else:
-            print("Usage:")
-            print("  python view_db.py              # View all scores")
-            print("  python view_db.py stats        # View statistics")
-            print("  python view_db.py query 'SQL'  # Run a query")
-            print("  python view_db.py interactive  # Interactive mode")
+    args = parse_args(sys.argv[1:])
+
+    if args.command == "list":
+        view_all_scores(args.limit, args.offset, args.after_id, args.user)
+    elif args.command == "stats":
+        view_stats(args.date_from, args.date_to, args.user, args.period, args.top, not args.no_histogram)
+    elif args.command == "query":
+        run_query(" ".join(args.sql), args.limit)
+    elif args.command == "export":
+        export_scores(args.format, args.output, args.user, args.batch_size)
+    elif args.command == "compact":
+        compact(args.keep_days, args.archive, args.user)
+    elif args.command == "interactive":
+        interactive_mode()
     else:
         view_all_scores()
-        view_stats()
+        view_stats(histogram=False)
         print("\nTip: Use 'python view_db.py interactive' for custom queries")
-
@@ -0,0 +1,313 @@
+"""
+Word-list loading with a compiled on-disk snapshot.
+
+The source spreadsheet (xlsx or CSV) is cleaned with vectorized pandas ops
+and the resulting word/definition table is pickled next to a fingerprint of
+the source file. Warm starts load the snapshot directly and only re-parse
+the source when its contents change. pandas (and openpyxl, through
+pandas.read_excel) is imported only when a source actually has to be parsed.
+
+A word list may come from several sources: files, or directories of xlsx/CSV
+files. Each file has its own snapshot, so editing one list re-parses only
+that file, and rows appended to a CSV are parsed on their own. id_map()
+translates ids between two versions of the store so running sessions can
+keep their place.
+"""
+import hashlib
+import io
+import os
+import pickle
+
+import lru_dir
+
+SNAPSHOT_DIR = os.environ.get("SPELLINGBEE_WORD_CACHE", ".word_cache")
+SNAPSHOT_VERSION = 2
+SOURCE_EXTS = (".xlsx", ".xls", ".csv")
+NO_DEFINITION = "No definition available."
+NUM_GROUPS = int(os.environ.get("SPELLINGBEE_NUM_GROUPS", 13))
+# How far (as a fraction of group size) a boundary may move to land on a change of initial letter
+GROUP_SNAP_FRACTION = float(os.environ.get("SPELLINGBEE_GROUP_SNAP", 0.25))
+
+
+def empty_words():
+    import pandas as pd
+    return pd.DataFrame(columns=["word", "definition"])
+
+
+def read_source(path):
+    """Read a raw word list from an xlsx or CSV file."""
+    import pandas as pd
+    if path.lower().endswith(".csv"):
+        return pd.read_csv(path)
+    return pd.read_excel(path)
+
+
+def clean_words(df):
+    """Pick the word/definition columns and normalize them without a per-row loop."""
+    import pandas as pd
+    if df.empty or len(df.columns) == 0:
+        return empty_words()
+    word_col = next((c for c in df.columns if str(c).lower() in ["word", "spelling"]), df.columns[0])
+    def_col = next((c for c in df.columns if any(k in str(c).lower() for k in ["def", "meaning", "desc"])), None)
+
+    df = df[df[word_col].notna()]
+    words = df[word_col].astype(str).str.strip()
+    if def_col is not None:
+        defs = df[def_col]
+        definitions = defs.astype(str).str.strip().where(defs.notna(), NO_DEFINITION)
+    else:
+        definitions = NO_DEFINITION
+    clean = pd.DataFrame({"word": words, "definition": definitions})
+    return clean.sort_values("word").reset_index(drop=True)
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _appended_tail(path, snap):
+    """If a CSV only grew since the snapshot, return (new_sha256, appended_bytes), else None."""
+    if not path.lower().endswith(".csv") or not snap.get("ends_with_newline"):
+        return None
+    h = hashlib.sha256()
+    remaining = snap["size"]
+    with open(path, "rb") as f:
+        while remaining:
+            chunk = f.read(min(remaining, 1 << 20))
+            if not chunk:
+                return None
+            h.update(chunk)
+            remaining -= len(chunk)
+        if h.hexdigest() != snap["sha256"]:
+            return None
+        tail = f.read()
+    h.update(tail)
+    return h.hexdigest(), tail
+
+
+def _snapshot_path(path):
+    name = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(SNAPSHOT_DIR, f"{name}.pkl")
+
+
+def _read_snapshot(snap_path):
+    try:
+        with open(snap_path, "rb") as f:
+            snap = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    if not isinstance(snap, dict) or snap.get("version") != SNAPSHOT_VERSION:
+        return None
+    return snap
+
+
+def _write_snapshot(snap_path, snap):
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    try:
+        lru_dir.atomic_write(snap_path, pickle.dumps(snap, protocol=pickle.HIGHEST_PROTOCOL))
+    except OSError:
+        pass  # the snapshot is only a cache; the next load parses the source again
+
+
+def _frame(words, definitions):
+    import pandas as pd
+    return pd.DataFrame({"word": words, "definition": definitions})
+
+
+def _snapshot(st, digest, words, definitions, columns, ends_with_newline):
+    return {
+        "version": SNAPSHOT_VERSION,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": digest,
+        "columns": columns,
+        "ends_with_newline": ends_with_newline,
+        "word": words,
+        "definition": definitions,
+    }
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return False
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def _load_columns(path):
+    """Return (words, definitions) lists for path, using the snapshot when it is current."""
+    if not os.path.exists(path):
+        return [], []
+    st = os.stat(path)
+    snap_path = _snapshot_path(path)
+    snap = _read_snapshot(snap_path)
+
+    # Fast path: same size and mtime means same contents
+    if snap and snap["size"] == st.st_size and snap["mtime_ns"] == st.st_mtime_ns:
+        return snap["word"], snap["definition"]
+
+    # Rows appended to a CSV: parse only the new tail and merge it in
+    appended = _appended_tail(path, snap) if snap and st.st_size > snap["size"] else None
+    if appended is not None:
+        import pandas as pd
+        digest, tail = appended
+        new_rows = clean_words(pd.read_csv(io.BytesIO(tail), header=None, names=snap["columns"]))
+        rows = sorted(
+            zip(snap["word"] + new_rows["word"].tolist(), snap["definition"] + new_rows["definition"].tolist()),
+            key=lambda row: row[0],
+        )
+        words, definitions = [w for w, _ in rows], [d for _, d in rows]
+        _write_snapshot(snap_path, _snapshot(st, digest, words, definitions, snap["columns"], _ends_with_newline(path)))
+        return words, definitions
+
+    digest = file_hash(path)
+    if snap and snap["sha256"] == digest:
+        # Touched but unchanged: refresh the fingerprint, skip the parse
+        snap.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+        _write_snapshot(snap_path, snap)
+        return snap["word"], snap["definition"]
+
+    raw = read_source(path)
+    clean = clean_words(raw)
+    words, definitions = clean["word"].tolist(), clean["definition"].tolist()
+    _write_snapshot(snap_path, _snapshot(st, digest, words, definitions, list(raw.columns), _ends_with_newline(path)))
+    return words, definitions
+
+
+def load_word_table(path):
+    """Return the cleaned word table for path as a DataFrame."""
+    return _frame(*_load_columns(path))
+
+
+def data_sources():
+    """Word-list sources configured for the app: SPELLINGBEE_DATA_SOURCES (files and/or
+    directories separated by os.pathsep), else SPELLINGBEE_DATA_FILE."""
+    data_file = os.environ.get("SPELLINGBEE_DATA_FILE", "Spelling bee 2026.xlsx")
+    return [p for p in os.environ.get("SPELLINGBEE_DATA_SOURCES", data_file).split(os.pathsep) if p]
+
+
+def expand_sources(sources):
+    """Return the word-list files named by sources; directories contribute their xlsx/CSV files."""
+    files = []
+    for source in sources:
+        if os.path.isdir(source):
+            files.extend(
+                os.path.join(source, name) for name in sorted(os.listdir(source))
+                if name.lower().endswith(SOURCE_EXTS) and not name.startswith(("~$", "."))
+            )
+        else:
+            files.append(source)
+    return files
+
+
+def load_word_lists(sources):
+    """Merge (words, definitions) of every source file; the first definition of a word wins."""
+    tables = [_load_columns(path) for path in expand_sources(sources)]
+    tables = [t for t in tables if t[0]]
+    if len(tables) <= 1:
+        return tables[0] if tables else ([], [])
+    merged = {}
+    for words, definitions in tables:
+        for word, definition in zip(words, definitions):
+            merged.setdefault(word, definition)
+    words = sorted(merged)
+    return words, [merged[w] for w in words]
+
+
+def sources_fingerprint(sources):
+    """Return a cheap fingerprint of every source file; changes when any file is added, removed or edited."""
+    return tuple((path, *source_fingerprint(path)) for path in expand_sources(sources))
+
+
+def source_fingerprint(path):
+    """Return a cheap (size, mtime_ns) fingerprint of a source file, or (0, 0) if missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (0, 0)
+    return (st.st_size, st.st_mtime_ns)
+
+
+def initial(word):
+    return word[:1].upper()
+
+
+def group_boundaries(words, num_groups=NUM_GROUPS, snap_fraction=GROUP_SNAP_FRACTION):
+    """Return num_groups + 1 offsets splitting sorted words into near-equal groups.
+
+    Each inner boundary starts at the even split and moves to the closest
+    change of initial letter within snap_fraction of a group, if there is one.
+    """
+    n = len(words)
+    per_group = max(1, n // num_groups)
+    tolerance = int(per_group * snap_fraction)
+    bounds = [0]
+    for g in range(1, num_groups):
+        target = min(g * per_group, n)
+        best = target
+        for delta in range(tolerance + 1):
+            for k in (target - delta, target + delta):
+                if bounds[-1] < k < n and initial(words[k]) != initial(words[k - 1]):
+                    best = k
+                    break
+            else:
+                continue
+            break
+        bounds.append(max(bounds[-1], best))
+    bounds.append(n)
+    return bounds
+
+
+class WordStore:
+    """Immutable, array-backed word table with a precomputed group index.
+
+    Sessions keep small integer ids into this store rather than pandas rows.
+    """
+
+    def __init__(self, words, definitions, num_groups=NUM_GROUPS):
+        self.words = tuple(words)
+        self.definitions = tuple(definitions)
+        self.num_groups = num_groups
+        self.ids = {}
+        for i, word in enumerate(self.words):
+            self.ids.setdefault(word, i)
+        self.bounds = group_boundaries(self.words, num_groups)
+        digest = hashlib.sha1()
+        for word, definition in zip(self.words, self.definitions):
+            digest.update(f"{word}\0{definition}\0".encode("utf-8"))
+        self.version = digest.hexdigest()[:16]
+
+    @classmethod
+    def from_frame(cls, df, num_groups=NUM_GROUPS):
+        return cls(df["word"].tolist(), df["definition"].tolist(), num_groups)
+
+    def __len__(self):
+        return len(self.words)
+
+    def group(self, group_num):
+        """Return the id range for a 1-based group number."""
+        return range(self.bounds[group_num - 1], self.bounds[group_num])
+
+    def ids_for(self, words):
+        """Return sorted ids of the given words that are in the store."""
+        return sorted(self.ids[w] for w in set(words) if w in self.ids)
+
+
+def id_map(old, new):
+    """Map ids in store old to ids of the same words in store new, plus ids of words new to it.
+
+    Returns (mapping, added_ids). Ids of words that were removed are absent from mapping.
+    """
+    mapping = {}
+    for i, word in enumerate(old.words):
+        j = new.ids.get(word)
+        if j is not None:
+            mapping[i] = j
+    added = [j for j, word in enumerate(new.words) if word not in old.ids]
+    return mapping, added